@@ -9,7 +9,12 @@ learning dynamics analysis.
 
 # ruff: noqa: F401
 
-from .training import load_checkpoint, save_checkpoint
+from .training import (
+    load_checkpoint,
+    save_checkpoint,
+    upload_checkpoint_folder,
+    PendingUpload,
+)
 from .evaluation import save_evaluation_results
 from .learning_dynamics import (
     compute_learning_dynamics_states,
@@ -41,10 +41,7 @@ def save_evaluation_results(
     if fabric.global_rank != 0:
         return
 
-    run_dir = os.path.join(checkpointing_config.runs_dir, checkpointing_config.run_name)
-    eval_results_dir = os.path.join(
-        run_dir, checkpointing_config.evaluation.eval_results_dir
-    )
+    eval_results_dir = checkpointing_config.eval_results_path
 
     os.makedirs(eval_results_dir, exist_ok=True)
 
@@ -9,7 +9,7 @@ import re
 import torch
 import torch.optim as optim
 from torch.nn import functional as F
-from torch.utils.data import DataLoader
+from torch.utils.data import DataLoader, TensorDataset
 from huggingface_hub import upload_folder
 
 import deepspeed
@@ -19,7 +19,7 @@ from src.training.utils.io import use_backoff
 
 # typing imports
 import torch.nn as nn
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 from datasets import Dataset
 from transformers import PreTrainedTokenizerBase
 from src.config import CheckpointingConfig
@@ -82,14 +82,12 @@ class CheckpointStateExtractor:
         ########################################################
 
         for sub_batch in dataloader:
-            _input_ids = torch.tensor(sub_batch["input_ids"], device=self.fabric.device)
+            _input_ids = sub_batch["input_ids"].to(self.fabric.device)
 
             if compute_gradients:
                 if "labels" in sub_batch:
                     input_ids = _input_ids
-                    labels = torch.tensor(
-                        sub_batch["labels"], device=self.fabric.device
-                    )
+                    labels = sub_batch["labels"].to(self.fabric.device)
                 else:
                     input_ids = _input_ids[:, :-1]
                     labels = _input_ids[:, 1:]
@@ -238,7 +236,7 @@ def compute_learning_dynamics_states(
     checkpointing_config: CheckpointingConfig,
     fabric: Fabric,
     model: nn.Module,
-    dataset: Dataset,
+    dataset: Union[Dataset, TensorDataset],
     compute_gradients: bool = False,
 ) -> Dict[str, torch.Tensor]:
     """Computes the learning dynamics metrics for a given checkpoint step.
@@ -250,7 +248,8 @@ def compute_learning_dynamics_states(
         checkpointing_config: The configuration object for checkpointing.
         fabric: The Fabric instance for distributed training.
         model: The model to extract states from.
-        dataset: The dataset to extract states from.
+        dataset: The dataset to extract states from; either a HuggingFace dataset with an
+            'input_ids' column, or a TensorDataset of input ids.
         compute_gradients: Whether to compute the gradients of the model parameters.
 
     Returns:
@@ -263,7 +262,14 @@ def compute_learning_dynamics_states(
 
     # Setting up Dataloader for learning dynamics
     def _collate_fn(batch):
-        return {"input_ids": [entry["input_ids"] for entry in batch]}
+        # NOTE: HuggingFace dataset entries are dicts, TensorDataset entries are tuples of tensors
+        if isinstance(batch[0], dict):
+            input_ids = torch.as_tensor(
+                [entry["input_ids"] for entry in batch], dtype=torch.long
+            )
+        else:
+            input_ids = torch.stack([entry[0] for entry in batch])
+        return {"input_ids": input_ids}
 
     batch_size = checkpointing_config.learning_dynamics.batch_size
     sub_batch_size = batch_size // fabric.world_size
@@ -338,7 +344,7 @@ def save_learning_dynamics_states(
     prefix: str,
     fabric: Fabric,
     learning_dynamics_states: Dict[str, torch.Tensor],
-    learning_dynamics_dataset: Optional[Dataset] = None,
+    learning_dynamics_dataset: Optional[Union[Dataset, TensorDataset]] = None,
     tokenizer: Optional[PreTrainedTokenizerBase] = None,
 ) -> None:
     """Save the learning dynamics metrics to the checkpointing directory.
@@ -348,7 +354,8 @@ def save_learning_dynamics_states(
     (i.e. a new column with the text is added to the dataset).
 
     The learning dynamics dataset is saved in the checkpointing directory as a HuggingFace
-    dataset.
+    dataset. NOTE: a TensorDataset of input ids (e.g. the training batch) is converted into a
+    HuggingFace dataset only here, in a single pass (together with the decoded text).
 
     Creates a versioned checkpoint directory with the following structure:
 
@@ -370,7 +377,8 @@ def save_learning_dynamics_states(
         fabric: The Fabric instance for distributed training.
         learning_dynamics_states: The learning dynamics states to save.
         learning_dynamics_dataset: The dataset containing learning dynamics data,
-            including input IDs that need to be decoded. (optional)
+            including input IDs that need to be decoded; either a HuggingFace dataset or a
+            TensorDataset of input ids. (optional)
         tokenizer: The tokenizer used to decode input IDs into text. (optional)
     """
 
@@ -378,13 +386,9 @@ def save_learning_dynamics_states(
     if fabric.global_rank != 0:
         return
 
-    runs_dir = checkpointing_config.runs_dir
-    run_name = checkpointing_config.run_name
-    checkpoints_dir = checkpointing_config.checkpoints_dir
     learning_dynamics_dir = checkpointing_config.learning_dynamics_dir
 
-    run_path = os.path.join(runs_dir, run_name)
-    root_checkpoint_path = os.path.join(run_path, checkpoints_dir)
+    root_checkpoint_path = checkpointing_config.checkpoints_path
     checkpoint_path = os.path.join(root_checkpoint_path, f"step_{checkpoint_step}")
     learning_dynamics_path = os.path.join(checkpoint_path, learning_dynamics_dir)
     os.makedirs(learning_dynamics_path, exist_ok=True)
@@ -397,7 +401,16 @@ def save_learning_dynamics_states(
             )
 
     if learning_dynamics_dataset is not None:
-        if tokenizer is not None:
+        if isinstance(learning_dynamics_dataset, TensorDataset):
+            # NOTE: the tensor of input ids is converted (and decoded) in one go
+            input_ids = learning_dynamics_dataset.tensors[0]
+            _dataset = {"input_ids": input_ids.numpy()}
+            if tokenizer is not None:
+                _dataset["text"] = tokenizer.batch_decode(
+                    input_ids, skip_special_tokens=True
+                )
+            learning_dynamics_dataset = Dataset.from_dict(_dataset)
+        elif tokenizer is not None:
             # go through dataset and decode the input ids; and add back into dataset
             detokenized_dataset = {"input_ids": [], "text": []}
 
@@ -14,7 +14,8 @@ from lightning.fabric.utilities.seed import _collect_rng_states, _set_rng_states
 from lightning.fabric.strategies import DeepSpeedStrategy
 from dataclasses import asdict
 
-from src.training.utils.io import use_backoff
+from src.training.utils.io import use_backoff, YamlSafeDumper
+from src.training.utils.initialization import flush_logging
 
 # typing imports
 from torch.optim import Optimizer
@@ -23,7 +24,24 @@ from torch import nn
 from transformers import PreTrainedTokenizerBase
 from lightning.fabric import Fabric
 from src.config import CheckpointingConfig
-from typing import Dict, Any, Union, Tuple
+from typing import Dict, Any, Union, Tuple, List
+from concurrent.futures import Future
+
+# A background upload to the HuggingFace Hub, along with the arguments it was submitted with (so
+# that it can be submitted again if it fails)
+PendingUpload = Tuple[Future, Dict[str, Any]]
+
+
+@use_backoff()
+def upload_checkpoint_folder(upload_kwargs: Dict[str, Any]) -> None:
+    """Upload a checkpoint folder to the HuggingFace Hub in the foreground.
+
+    Used to submit a background upload (see save_checkpoint) again after it has failed.
+
+    Args:
+        upload_kwargs: The arguments of the background upload, passed on to upload_folder
+    """
+    upload_folder(**upload_kwargs)
 
 
 @use_backoff()
@@ -54,10 +72,7 @@ def load_checkpoint(
         checkpoint_step = f"step_{checkpoint_step}"
 
     checkpoint_path = os.path.join(
-        checkpointing_config.runs_dir,
-        checkpointing_config.run_name,
-        checkpointing_config.checkpoints_dir,
-        checkpoint_step,
+        checkpointing_config.checkpoints_path, checkpoint_step
     )
 
     if not os.path.exists(checkpoint_path):
@@ -104,7 +119,7 @@ def save_checkpoint(
     lr_scheduler: LRScheduler,
     tokenizer: PreTrainedTokenizerBase,
     upload_logs: bool = False,
-) -> None:
+) -> List[PendingUpload]:
     """Save training checkpoint and associated states to disk and optionally to HuggingFace Hub.
 
     We save the following files:
@@ -148,18 +163,22 @@ def save_checkpoint(
         tokenizer: The tokenizer to save
         upload_logs: Whether to upload training logs to HF Hub (default: False)
 
+    Returns:
+        List[PendingUpload]: The uploads of the (large) fabric checkpoint files and logs to the
+            HuggingFace Hub, which are run in the background so that they do not block training.
+            NOTE: the caller is responsible for waiting on these (and handling their failures)
+            before saving the next checkpoint.
     """
 
     checkpointing_config = configs["checkpointing"]
+    pending_uploads = []
 
     # Get the directories from the training config
-    runs_dir = checkpointing_config.runs_dir
-    checkpoints_dir = checkpointing_config.checkpoints_dir
     fabric_checkpoint_dir = checkpointing_config.fabric_checkpoint_dir
     logs_dir = checkpointing_config.logs_dir
 
-    run_path = os.path.join(runs_dir, checkpointing_config.run_name)
-    root_checkpoint_path = os.path.join(run_path, checkpoints_dir)
+    run_path = checkpointing_config.run_path
+    root_checkpoint_path = checkpointing_config.checkpoints_path
     checkpoint_path = os.path.join(root_checkpoint_path, f"step_{checkpoint_step}")
 
     # Create directories
@@ -216,7 +235,7 @@ def save_checkpoint(
             for config_name, config in configs.items():
                 _training_config[config_name] = asdict(config)
             with open(config_path, "w") as f:
-                yaml.dump(_training_config, f)
+                yaml.dump(_training_config, f, Dumper=YamlSafeDumper)
 
         # Update latest symlink
         latest_symlink_path = os.path.join(root_checkpoint_path, "latest")
@@ -264,24 +283,35 @@ def save_checkpoint(
                     token=os.getenv("HF_TOKEN"),
                 )
 
-            # Upload the fabric checkpoint directory
-            upload_folder(
-                folder_path=fabric_checkpoint_path,
-                path_in_repo=fabric_checkpoint_dir,
-                repo_id=repo_id,
-                commit_message=f"Saving Fabric Checkpoint -- Step {checkpoint_step}",
-                revision=checkpointing_config.run_name,
-                token=os.getenv("HF_TOKEN"),
+            # Upload the fabric checkpoint directory (in the background)
+            upload_kwargs = {
+                "folder_path": fabric_checkpoint_path,
+                "path_in_repo": fabric_checkpoint_dir,
+                "repo_id": repo_id,
+                "commit_message": f"Saving Fabric Checkpoint -- Step {checkpoint_step}",
+                "revision": checkpointing_config.run_name,
+                "token": os.getenv("HF_TOKEN"),
+            }
+            pending_uploads.append(
+                (upload_folder(**upload_kwargs, run_as_future=True), upload_kwargs)
             )
 
             # Upload logs if requested
             if upload_logs:
-                logs_path = os.path.join(run_path, logs_dir)
-                upload_folder(
-                    folder_path=logs_path,
-                    path_in_repo=logs_dir,
-                    repo_id=repo_id,
-                    commit_message=f"Saving Logs -- Step {checkpoint_step}",
-                    revision=checkpointing_config.run_name,
-                    token=os.getenv("HF_TOKEN"),
+                # NOTE: the log records are written out by a background thread, so make sure
+                # that the queued records are in the log file before it is uploaded
+                flush_logging()
+
+                upload_kwargs = {
+                    "folder_path": checkpointing_config.logs_path,
+                    "path_in_repo": logs_dir,
+                    "repo_id": repo_id,
+                    "commit_message": f"Saving Logs -- Step {checkpoint_step}",
+                    "revision": checkpointing_config.run_name,
+                    "token": os.getenv("HF_TOKEN"),
+                }
+                pending_uploads.append(
+                    (upload_folder(**upload_kwargs, run_as_future=True), upload_kwargs)
                 )
+
+    return pending_uploads
@@ -11,6 +11,10 @@ switch to different config management systems if you want, like hydra.
 Some things to NOTE:
 - All hyperparameters are initialized with default values, which can be overridden.
 - The default vocab size is set to the size of the OLMo tokenizer.
+- The model, monitoring and checkpointing configs are frozen (and, where possible, slotted)
+  dataclasses; to change a value, build a new config with `dataclasses.replace` rather than
+  setting the attribute. We deliberately keep to plain dataclasses (rather than e.g. attrs or
+  msgspec structs) because the rest of the codebase relies on `fields`, `asdict` and `replace`.
 """
 
 # ruff: noqa: F401
@@ -5,8 +5,10 @@ Specifies the hyperparameters for the checkpointing process; checkpointing is us
 the model and optimizer states, as well as the learning dynamics metrics.
 """
 
-from dataclasses import dataclass, field
-from typing import Optional, List
+import os
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional, Tuple
 
 from ._constants import (
     RUNS_DIR,
@@ -18,27 +20,24 @@ from ._constants import (
     LEARNING_DYNAMICS_DIR,
 )
 
+# NOTE: tuples are immutable, so the default can be shared across instances without a factory
+_DEFAULT_LAYER_SUFFIXES = ("attention.v_proj", "attention.o_proj", "swiglu.w_2")
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class TrainingCheckpointingConfig:
     auto_resume: bool = True
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EvaluationCheckpointingConfig:
     eval_results_dir: str = EVAL_RESULTS_DIR
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LearningDynamicsCheckpointingConfig:
     # Suffixes of the layers to compute learning dynamics for
-    layer_suffixes: List[str] = field(
-        default_factory=lambda: [
-            "attention.v_proj",
-            "attention.o_proj",
-            "swiglu.w_2",
-        ]
-    )
+    layer_suffixes: Tuple[str, ...] = _DEFAULT_LAYER_SUFFIXES
 
     # Sequence index at which to extract hidden states; by default, we extract the hidden states
     # at the last token of the sequence (-1)
@@ -52,20 +51,34 @@ class LearningDynamicsCheckpointingConfig:
     # NOTE: this dataset should be small, ideally just a batch of additional data
     eval_data: Optional[str] = "pico-lm/pretokenized-paloma-tinsy"
 
+    def __post_init__(self):
+        # NOTE: overrides loaded from yaml come in as lists; we keep a tuple so the config is hashable
+        if self.layer_suffixes is not None:
+            object.__setattr__(self, "layer_suffixes", tuple(self.layer_suffixes))
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class HuggingFaceCheckpointingConfig:
     # Should be in the format of <(username or organization name)>/<repo_name>, e.g. pico-lm/demo
     repo_id: str = ""
 
     # HuggingFace Collection Slug (specifies a tag for the run)
-    collection_slug: Optional[str] = None
+    collection_slug: str = ""
+
 
+# NOTE: The sub-configs are frozen, so a single default instance can be shared across all
+# CheckpointingConfig instances instead of being rebuilt by a default_factory every time.
+_DEFAULT_HF_CHECKPOINT = HuggingFaceCheckpointingConfig()
+_DEFAULT_TRAINING = TrainingCheckpointingConfig()
+_DEFAULT_EVALUATION = EvaluationCheckpointingConfig()
+_DEFAULT_LEARNING_DYNAMICS = LearningDynamicsCheckpointingConfig()
 
-@dataclass
+
+# NOTE: not slotted, so that the derived paths below can be cached on the instance __dict__
+@dataclass(frozen=True)
 class CheckpointingConfig:
     # Name of the run
-    run_name: Optional[str] = None
+    run_name: str = ""
 
     runs_dir: str = RUNS_DIR
     checkpoints_dir: str = CHECKPOINTS_DIR
@@ -78,17 +91,27 @@ class CheckpointingConfig:
     save_every_n_steps: int = 1000
 
     # Whether to save checkpoints to HuggingFace
-    save_to_hf: Optional[bool] = False
-    hf_checkpoint: HuggingFaceCheckpointingConfig = field(
-        default_factory=HuggingFaceCheckpointingConfig
-    )
-
-    training: TrainingCheckpointingConfig = field(
-        default_factory=TrainingCheckpointingConfig
-    )
-    evaluation: EvaluationCheckpointingConfig = field(
-        default_factory=EvaluationCheckpointingConfig
-    )
-    learning_dynamics: LearningDynamicsCheckpointingConfig = field(
-        default_factory=LearningDynamicsCheckpointingConfig
-    )
+    save_to_hf: bool = False
+    hf_checkpoint: HuggingFaceCheckpointingConfig = _DEFAULT_HF_CHECKPOINT
+
+    training: TrainingCheckpointingConfig = _DEFAULT_TRAINING
+    evaluation: EvaluationCheckpointingConfig = _DEFAULT_EVALUATION
+    learning_dynamics: LearningDynamicsCheckpointingConfig = _DEFAULT_LEARNING_DYNAMICS
+
+    # Paths derived from the directories above; computed once per config rather than on every save
+
+    @cached_property
+    def run_path(self) -> str:
+        return os.path.join(self.runs_dir, self.run_name)
+
+    @cached_property
+    def checkpoints_path(self) -> str:
+        return os.path.join(self.run_path, self.checkpoints_dir)
+
+    @cached_property
+    def logs_path(self) -> str:
+        return os.path.join(self.run_path, self.logs_dir)
+
+    @cached_property
+    def eval_results_path(self) -> str:
+        return os.path.join(self.run_path, self.evaluation.eval_results_dir)
@@ -10,7 +10,7 @@ from typing import Optional, List
 from src.config._constants import MAX_SEQ_LEN
 
 
-@dataclass
+@dataclass(slots=True)
 class PalomaEvaluationConfig:
     dataset_name: str = "pico-lm/pretokenized-paloma-tinsy"
     dataset_split: str = "val"
@@ -18,7 +18,7 @@ class PalomaEvaluationConfig:
     batch_size: int = 16
 
 
-@dataclass
+@dataclass(slots=True)
 class EvaluationConfig:
     # Evaluation metrics to compute: by default, we compute the perplexity of the model
     metrics: Optional[List[str]] = field(default_factory=lambda: ["paloma"])
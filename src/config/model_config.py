@@ -10,7 +10,7 @@ from typing import Optional
 from ._constants import VOCAB_SIZE, BATCH_SIZE, MAX_SEQ_LEN
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModelConfig:
     model_type: str = "pico_decoder"
 
@@ -37,3 +37,47 @@ class ModelConfig:
 
     # Hyperparameter for the rank normalization loss
     rank_normalization_loss_weight: float = 0.0
+
+    # Whether to upcast the output logits to float32 (otherwise they are in the compute dtype)
+    fp32_logits: bool = True
+
+    def __post_init__(self):
+        """
+        Validate the architecture invariants once at construction, so that the model code can
+        assume them.
+
+        NOTE: attention_n_kv_heads of None is resolved to attention_n_heads (i.e. no GQA); the
+        config is frozen, so this is set via object.__setattr__.
+        """
+        if self.attention_n_kv_heads is None:
+            object.__setattr__(self, "attention_n_kv_heads", self.attention_n_heads)
+
+        assert self.d_model > 0, "d_model must be positive"
+        assert self.n_layers > 0, "n_layers must be positive"
+        assert self.batch_size > 0, "batch_size must be positive"
+        assert self.max_seq_len > 0, "max_seq_len must be positive"
+        assert self.attention_n_heads > 0, "attention_n_heads must be positive"
+        assert (
+            self.d_model % self.attention_n_heads == 0
+        ), "d_model must be divisible by attention_n_heads"
+        assert (
+            0 < self.attention_n_kv_heads <= self.attention_n_heads
+        ), "attention_n_kv_heads must be in (0, attention_n_heads]"
+        assert (
+            self.attention_n_heads % self.attention_n_kv_heads == 0
+        ), "attention_n_heads must be divisible by attention_n_kv_heads"
+
+    # NOTE: Derived attention dimensions are properties (rather than fields), so that they are
+    # not serialized by asdict (e.g. into training_config.yaml or the HF config.json).
+
+    @property
+    def head_dim(self) -> int:
+        return self.d_model // self.attention_n_heads
+
+    @property
+    def n_rep(self) -> int:
+        return self.attention_n_heads // self.attention_n_kv_heads
+
+    @property
+    def inv_sqrt_head_dim(self) -> float:
+        return self.head_dim**-0.5
@@ -4,25 +4,30 @@ Monitoring Config
 Specifies the monitoring process, e.g. how to log metrics and keep track of training progress.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LoggingConfig:
     log_level: str = "INFO"
     log_every_n_steps: int = 100
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WandbConfig:
     project: str = ""
     entity: str = ""
 
 
-@dataclass
+# NOTE: The sub-configs are frozen, so the default instances can be shared
+_DEFAULT_LOGGING = LoggingConfig()
+_DEFAULT_WANDB = WandbConfig()
+
+
+@dataclass(frozen=True, slots=True)
 class MonitoringConfig:
-    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    logging: LoggingConfig = _DEFAULT_LOGGING
 
     # Weights and Biases
     save_to_wandb: bool = False
-    wandb: WandbConfig = field(default_factory=WandbConfig)
+    wandb: WandbConfig = _DEFAULT_WANDB
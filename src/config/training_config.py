@@ -8,7 +8,7 @@ from dataclasses import dataclass, field
 from ._constants import GRADIENT_ACCUMULATION_STEPS
 
 
-@dataclass
+@dataclass(slots=True)
 class FabricConfig:
     num_nodes: int = 1
     num_devices: int = 1
@@ -16,7 +16,7 @@ class FabricConfig:
     accelerator: str = "cuda"
 
 
-@dataclass
+@dataclass(slots=True)
 class OptimizationConfig:
     # Optimizer
     optimizer: str = "adamw"
@@ -30,8 +30,13 @@ class OptimizationConfig:
     gradient_accumulation_steps: int = GRADIENT_ACCUMULATION_STEPS
 
 
-@dataclass
+@dataclass(slots=True)
 class TrainingConfig:
     fabric: FabricConfig = field(default_factory=FabricConfig)
     optimization: OptimizationConfig = field(default_factory=OptimizationConfig)
     max_steps: int = 200_000
+
+    # Whether to compile the model with torch.compile before training
+    # NOTE: compilation adds a warm-up cost at the start of training, so it is off by default
+    # (e.g. for short debugging runs)
+    compile_model: bool = False
@@ -78,8 +78,7 @@ def run_evaluation(
     # NOTE: Evaluation is only run on first processes to enable third-party evaluation libraries
     # to determine how to handle distributed evaluation.
     if fabric.global_rank == 0:
-        run_name = checkpointing_config.run_name
-        model_path = f"{os.getcwd()}/{checkpointing_config.runs_dir}/{run_name}/{checkpointing_config.checkpoints_dir}/latest"
+        model_path = f"{os.getcwd()}/{checkpointing_config.checkpoints_path}/latest"
         os.makedirs(model_path, exist_ok=True)
 
         for metric in evaluation_config.metrics:
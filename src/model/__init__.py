@@ -5,8 +5,18 @@ This Package contains Pico models (currently only the Pico Decoder). We plan to
 architectures in the future.
 
 If you have other models you'd like to implement, we recommend you add modules to this package.
+
+NOTE: Models are imported lazily on first access (PEP 562), so that importing this package (e.g.
+from config-only tooling) does not pull in torch and transformers.
 """
 
-# ruff: noqa: F401
+__all__ = ["PicoDecoder"]
+
+
+def __getattr__(name):
+    if name == "PicoDecoder":
+        from .pico_decoder import PicoDecoder
 
-from .pico_decoder import PicoDecoder
+        globals()[name] = PicoDecoder
+        return PicoDecoder
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
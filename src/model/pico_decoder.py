@@ -12,7 +12,7 @@ Key features:
 - SwiGLU activation function
 - Residual connections throughout
 
-- KV-cache for faster autoregressive generation
+- Static (pre-allocated) KV-cache for faster autoregressive generation
 
 References:
     - RoPE: https://arxiv.org/abs/2104.09864
@@ -41,7 +41,7 @@ from transformers import PretrainedConfig, PreTrainedModel
 from transformers.modeling_outputs import CausalLMOutputWithPast, CausalLMOutput
 
 # typing imports
-from typing import Union, Tuple, Optional, TYPE_CHECKING, Dict, Any
+from typing import Union, Tuple, Optional, TYPE_CHECKING, Dict, Any, List, Callable
 
 from safetensors import safe_open
 
@@ -59,6 +59,10 @@ except ImportError:
 ########################################################
 
 
+# F.rms_norm was only added in PyTorch 2.4
+_HAS_NATIVE_RMS_NORM = hasattr(F, "rms_norm")
+
+
 class RMSNorm(torch.nn.Module):
     """Root Mean Square Layer Normalization.
 
@@ -82,15 +86,22 @@ class RMSNorm(torch.nn.Module):
     def _norm(self, x: torch.Tensor) -> torch.Tensor:
         """
         Normalizes the input tensor by its RMS value.
+
+        NOTE: Only the reduction is computed in float32 (for numerical stability); the input is
+        scaled in its own dtype, so no float32 copy of the full activations is needed.
         """
-        return x * torch.rsqrt(x.pow(2).mean(-1, keepdim=True) + self.eps)
+        inv_rms = torch.rsqrt(x.float().pow(2).mean(-1, keepdim=True) + self.eps)
+        return x * inv_rms.to(x.dtype)
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         """
         Applies RMS normalization to the input tensor and scales it by the weight parameter.
+
+        NOTE: Uses the native (fused) rms_norm kernel where available (PyTorch 2.4+).
         """
-        output = self._norm(x.float()).type_as(x)
-        return output * self.weight
+        if _HAS_NATIVE_RMS_NORM:
+            return F.rms_norm(x, (x.shape[-1],), weight=self.weight, eps=self.eps)
+        return self._norm(x) * self.weight
 
 
 ########################################################
@@ -100,104 +111,163 @@ class RMSNorm(torch.nn.Module):
 ########################################################
 
 
-class RoPE(nn.Module):
-    """Rotary Positional Embeddings (RoPE).
+"""
+Rotary Positional Embeddings (RoPE).
 
-    Implements position-dependent rotation of keys and queries in attention mechanism,
-    allowing better modeling of relative positions in sequences. Uses complex number
-    operations for efficient rotation.
+Implements position-dependent rotation of keys and queries in attention mechanism, allowing better
+modeling of relative positions in sequences. Each pair of features is rotated with precomputed
+(real-valued) cos and sin tables.
 
-    Args:
-        config (Union[ModelConfig, PicoHFConfig]): Model configuration containing:
-            - config.position_emb_theta: Base for frequency computation
-            - config.d_model: Model dimension
-            - config.attention_n_heads: Number of attention heads
-            - config.max_seq_len: Maximum sequence length
+NOTE: The RoPE tables are the same for every layer, so they are owned by the PicoDecoder (as a
+single pair of buffers) and passed down to the attention layers, rather than each layer keeping
+its own copy.
 
-    References:
-        https://arxiv.org/abs/2104.09864
+References:
+    https://arxiv.org/abs/2104.09864
+"""
+
+
+def setup_rope_freqs(
+    seq_len: int,
+    theta: float,
+    dim: int,
+    device: Optional[torch.device] = None,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Setup Frequency Tables for RoPE Embeddings
+
+    Initializes the cos and sin tables (of shape (seq_len, dim/2)) that are used to compute
+    the RoPE embeddings.
+
+    NOTE: Rotating a pair of features (x_even, x_odd) by an angle is the same as multiplying
+    the complex number x_even + i * x_odd by e^(i * angle), but using real-valued tables avoids
+    complex (float32-only) ops that cannot be fused with the surrounding ops.
+
+    NOTE: The tables are computed directly on the given device (rather than computed on the CPU
+    and then copied over).
     """
+    _dims = torch.arange(0, dim, 2, device=device, dtype=torch.float32)[: (dim // 2)]
+    _freqs = 1.0 / (theta ** (_dims / dim))
+    positions = torch.arange(seq_len, device=device, dtype=torch.float32)
+    freqs = torch.outer(positions, _freqs)
+    return torch.cos(freqs), torch.sin(freqs)
 
-    _freqs_cis_tensor: torch.Tensor | None = None
 
-    def __init__(self, config: Union["ModelConfig", "PicoDecoderHFConfig"]):
-        super().__init__()
+def _rotate(x: torch.Tensor, cos: torch.Tensor, sin: torch.Tensor) -> torch.Tensor:
+    """Rotates each (even, odd) pair of features of x by the given angles."""
+    x_even, x_odd = x[..., ::2], x[..., 1::2]
+    x_rotated = torch.stack(
+        [x_even * cos - x_odd * sin, x_even * sin + x_odd * cos], dim=-1
+    )
+    return x_rotated.flatten(-2)
 
-        self.theta = config.position_emb_theta
-        self.dim = config.d_model // config.attention_n_heads
 
-        max_seq_len = config.max_seq_len
+def apply_rope(
+    queries: torch.Tensor,
+    keys: torch.Tensor,
+    rope_freqs: Tuple[torch.Tensor, torch.Tensor],
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Apply RoPE Embeddings to Queries and Keys
 
-        # only gets set once, and then reused for all RoPE instances
-        if RoPE._freqs_cis_tensor is None:
-            RoPE._freqs_cis_tensor = self._setup_freqs_cis(
-                max_seq_len, self.theta, self.dim
-            )
+    Applies the rotary positional embeddings to the input tensors; the rotation is done in the
+    dtype of the inputs.
 
-        # register _freqs_cis buffer
-        # can be easily recomputed so persistent=False
-        self.register_buffer("_freqs_cis", self._freqs_cis_tensor, persistent=False)
+    Args:
+        queries: (batch_size, n_heads, seq_len, head_dim)
+        keys: (batch_size, n_kv_heads, seq_len, head_dim)
+        rope_freqs: The cos and sin tables at the positions of the input tokens, each of shape
+            (seq_len, head_dim/2); these broadcast over the batch and head dimensions
+    """
+    cos, sin = rope_freqs
+    cos = cos.to(queries.dtype)
+    sin = sin.to(queries.dtype)
 
-    @classmethod
-    def _setup_freqs_cis(cls, seq_len: int, theta: float, dim: int) -> torch.Tensor:
-        """Setup Frequency Tensor for RoPE Embeddings
+    return _rotate(queries, cos, sin), _rotate(keys, cos, sin)
 
-        Initializes the complex frequency tensor that is used to compute the RoPE embeddings.
 
-        Note other implementations will use cos and sin directly, but using the complex
-        number representation is (probably?) more efficient:
+########################################################
+#
+# KV Cache
+#
+########################################################
 
-            e^(theta * i * t) = cos(theta * t) + i * sin(theta * t) [Euler's formula]
-        """
-        _freqs = 1.0 / (theta ** (torch.arange(0, dim, 2)[: (dim // 2)].float() / dim))
-        positions = torch.arange(seq_len)
-        freqs = torch.outer(positions, _freqs)
-        return torch.polar(torch.ones_like(freqs), freqs)  # complex64
 
-    def get_freqs_cis(
-        self, input_shape: torch.Size, start_pos: int, end_pos: int
-    ) -> torch.Tensor:
-        """Reshape Frequency Tensor for RoPE Embeddings
+class StaticKVCache(nn.Module):
+    """Pre-allocated Key-Value cache for all of the attention layers of the model.
 
-        Makes the frequency tensor broadcastable with the input tensor.
-        """
-        _freqs_cis = self._freqs_cis[start_pos:end_pos]
-        ndim = len(input_shape)
-        assert 0 <= 1 < ndim
-        assert _freqs_cis.shape == (input_shape[1], input_shape[-1])
+    Rather than growing the cached keys and values by concatenation at every decoding step (which
+    reallocates the whole cache and changes the tensor shapes from step to step), the cache is
+    allocated once for the maximum sequence length and new keys and values are written in place
+    at their positions. The shapes seen by attention are therefore the same at every step, which
+    is what allows the decoding step to be compiled or captured in a CUDA graph.
 
-        # TODO: Check whether this is correct (might be able to remove this)
-        shape = [d if i == 1 or i == ndim - 1 else 1 for i, d in enumerate(input_shape)]
-        return _freqs_cis.view(*shape)
+    The keys and values of all of the layers are stored in a single contiguous tensor; each layer
+    reads and writes (views of) its own slice of this tensor.
 
-    def forward(
-        self,
-        queries: torch.Tensor,
-        keys: torch.Tensor,
-        start_pos: int = 0,
-    ) -> Tuple[torch.Tensor, torch.Tensor]:
-        """Apply RoPE Embeddings to Queries and Keys
+    Args:
+        n_layers: Number of attention layers
+        batch_size: Batch size of the cache
+        max_seq_len: Maximum number of positions that can be cached
+        n_kv_heads: Number of key/value heads
+        head_dim: Dimension of each head
+        dtype: Dtype of the cache
+        device: Device of the cache
 
-        Applies the rotary positional embeddings to the input tensors via complex num multiplication
+    Shape:
+        - Cache: (n_layers, 2, batch_size, n_kv_heads, max_seq_len, head_dim), where the second
+          dimension indexes the keys (0) and values (1)
+    """
 
-        NOTE: The start_pos is used if we want to use the kv_cache in the attention mechanism.
-        """
-        queries_ = torch.view_as_complex(
-            queries.float().reshape(*queries.shape[:-1], -1, 2)
+    def __init__(
+        self,
+        n_layers: int,
+        batch_size: int,
+        max_seq_len: int,
+        n_kv_heads: int,
+        head_dim: int,
+        dtype: Optional[torch.dtype] = None,
+        device: Optional[torch.device] = None,
+    ):
+        super().__init__()
+
+        cache_shape = (n_layers, 2, batch_size, n_kv_heads, max_seq_len, head_dim)
+        self.register_buffer(
+            "kv_cache",
+            torch.zeros(cache_shape, dtype=dtype, device=device),
+            persistent=False,
         )
-        keys_ = torch.view_as_complex(keys.float().reshape(*keys.shape[:-1], -1, 2))
 
-        input_shape = (
-            queries_.shape
-        )  # same as keys: (batch_size, seq_len, n_heads, head_dim/2)
-        freqs_start_pos = start_pos
-        freqs_end_pos = freqs_start_pos + queries_.shape[1]
+        # Number of positions that have been written to the cache; only used to infer the
+        # positions of the next tokens when these are not passed in explicitly.
+        self.seq_len = 0
 
-        freqs_cis = self.get_freqs_cis(input_shape, freqs_start_pos, freqs_end_pos)
+    def is_compatible(
+        self,
+        batch_size: int,
+        dtype: torch.dtype,
+        device: torch.device,
+    ) -> bool:
+        """Whether this cache can be reused for the given batch size, dtype and device."""
+        device = torch.device(device)
+        return (
+            self.kv_cache.shape[2] == batch_size
+            and self.kv_cache.dtype == dtype
+            and self.kv_cache.device.type == device.type
+            and (device.index is None or self.kv_cache.device.index == device.index)
+        )
 
-        queries_rotated = torch.view_as_real(queries_ * freqs_cis).flatten(3)
-        keys_rotated = torch.view_as_real(keys_ * freqs_cis).flatten(3)
-        return queries_rotated.type_as(queries), keys_rotated.type_as(keys)
+    def update(
+        self,
+        layer_idx: int,
+        cache_position: torch.Tensor,
+        keys: torch.Tensor,
+        values: torch.Tensor,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Write the new keys and values of a layer at the given positions and return the full
+        (keys and values) cache of that layer."""
+        k_cache, v_cache = self.kv_cache[layer_idx]
+        k_cache.index_copy_(2, cache_position, keys.to(k_cache.dtype))
+        v_cache.index_copy_(2, cache_position, values.to(v_cache.dtype))
+        return k_cache, v_cache
 
 
 ########################################################
@@ -207,6 +277,17 @@ class RoPE(nn.Module):
 ########################################################
 
 
+# Kernels that scaled dot-product attention may choose from, in order of preference.
+# NOTE: the FlashAttention kernel only supports fp16/bf16 inputs without an explicit mask (i.e. the
+# causal attention without the KV cache); in all other cases SDPA falls through to the others.
+SDPA_BACKENDS = [
+    SDPBackend.FLASH_ATTENTION,
+    SDPBackend.CUDNN_ATTENTION,
+    SDPBackend.EFFICIENT_ATTENTION,
+    SDPBackend.MATH,
+]
+
+
 class Attention(nn.Module):
     """Multi-head Attention with Group Query Attention support.
 
@@ -222,6 +303,7 @@ class Attention(nn.Module):
             - config.d_model: Model dimension
             - config.batch_size: Maximum batch size
             - config.max_seq_len: Maximum sequence length
+        layer_idx (int): Index of the layer in the model; used to index the KV cache
 
     Shape:
         - Input: (batch_size, seq_len, d_model)
@@ -231,9 +313,12 @@ class Attention(nn.Module):
     def __init__(
         self,
         config: Union["ModelConfig", "PicoDecoderHFConfig"],
+        layer_idx: int = 0,
     ):
         super().__init__()
 
+        self.layer_idx = layer_idx
+
         self.normalization_strategy = config.rank_normalization_strategy
 
         self.n_heads = config.attention_n_heads
@@ -247,8 +332,13 @@ class Attention(nn.Module):
 
         self.n_rep = self.n_heads // self.n_kv_heads
 
-        self.q_proj = nn.Linear(d_model, self.n_heads * self.head_dim, bias=False)
-        self.k_proj = nn.Linear(d_model, self.n_kv_heads * self.head_dim, bias=False)
+        # NOTE: the query and key projections are fused into a single linear layer, so that the
+        # input is read once and a single (larger) matmul is launched. The value projection is
+        # kept separate, since it can be spectrally normalized and is one of the layers that we
+        # study (see TARGET_MODULES and the learning dynamics layer_suffixes).
+        self.q_dim = self.n_heads * self.head_dim
+        self.k_dim = self.n_kv_heads * self.head_dim
+        self.qk_proj = nn.Linear(d_model, self.q_dim + self.k_dim, bias=False)
         _v_proj = nn.Linear(d_model, self.n_kv_heads * self.head_dim, bias=False)
         _o_proj = nn.Linear(self.n_heads * self.head_dim, d_model, bias=False)
 
@@ -259,15 +349,25 @@ class Attention(nn.Module):
             self.v_proj = _v_proj
             self.o_proj = _o_proj
 
-        self.rope = RoPE(config)
+        self._register_load_state_dict_pre_hook(self._fuse_unfused_weights)
+
+    @staticmethod
+    def _fuse_unfused_weights(state_dict, prefix, *args) -> None:
+        """Load checkpoints with separate q_proj and k_proj projections into the fused qk_proj."""
+        q_key, k_key = f"{prefix}q_proj.weight", f"{prefix}k_proj.weight"
+        if q_key in state_dict and k_key in state_dict:
+            state_dict[f"{prefix}qk_proj.weight"] = torch.cat(
+                [state_dict.pop(q_key), state_dict.pop(k_key)], dim=0
+            )
 
     def forward(
         self,
         input: torch.Tensor,
+        rope_freqs: Tuple[torch.Tensor, torch.Tensor],
         mask: Optional[torch.Tensor] = None,
-        past_key_values: Optional[Tuple[torch.Tensor, ...]] = None,
-        use_cache: bool = False,
-    ) -> Tuple[torch.Tensor, Optional[Tuple[torch.Tensor, torch.Tensor]]]:
+        kv_cache: Optional[StaticKVCache] = None,
+        cache_position: Optional[torch.Tensor] = None,
+    ) -> torch.Tensor:
         """Forward pass for the attention mechanism.
 
         Computes queries, keys, and values for the attention mechanism. Applies rotary positional
@@ -277,46 +377,40 @@ class Attention(nn.Module):
         https://arxiv.org/abs/1706.03762
 
         A few things to note:
-        - The past_key_values is used to implement the KV cache, which is used to speed up
-          generation by caching the KV pairs from previous forward passes. This is useful when doing
-          tasks that require generating multiple tokens conditioned on previous tokens (e.g. language
-          modeling, text generation, etc.). The way the KV cache is implemented is that each layer has
-          its own KV cache - this KV cache is implemented as a tuple.
+        - The rope_freqs are the RoPE cos and sin tables at the positions of the input tokens;
+          these are shared by all of the layers, and so are computed once by the PicoDecoder.
+        - The kv_cache is used to implement the KV cache, which is used to speed up generation by
+          caching the KV pairs from previous forward passes. This is useful when doing tasks that
+          require generating multiple tokens conditioned on previous tokens (e.g. language
+          modeling, text generation, etc.). The StaticKVCache holds the cache of all layers; the
+          new keys and values are written into the slice of this layer at cache_position (the
+          absolute positions of the input tokens), and the queries then attend over the whole
+          cache of the layer - the mask takes care of hiding the positions that come after each
+          query.
+        - The mask is boolean (True where attention is allowed); if no mask is passed in, the
+          attention is causal over the input tokens.
         """
         bsz, seq_len, _ = input.shape
-        _queries, _keys, _values = (
-            self.q_proj(input),
-            self.k_proj(input),
-            self.v_proj(input),
-        )
+        _queries, _keys = self.qk_proj(input).split([self.q_dim, self.k_dim], dim=-1)
+        _values = self.v_proj(input)
 
-        # Reshaping for multi-head attention
+        # Reshaping for multi-head attention: (batch_size, n_heads, seq_len, head_dim)
+        # NOTE: the transposes are views; this is also the layout of the KV cache and the layout
+        # expected by the SDPA kernel, so no copies are needed
         queries = _queries.view(bsz, seq_len, self.n_heads, self.head_dim)
         keys = _keys.view(bsz, seq_len, self.n_kv_heads, self.head_dim)
         values = _values.view(bsz, seq_len, self.n_kv_heads, self.head_dim)
-
-        # The start position is used to apply the RoPE embeddings to only the new tokens
-        # when using the kv_cache in the attention mechanism.
-        # We want to start from the last position in the cache.
-        start_pos = past_key_values[0].shape[1] if past_key_values is not None else 0
+        queries, keys, values = (
+            queries.transpose(1, 2),
+            keys.transpose(1, 2),
+            values.transpose(1, 2),
+        )
 
         # apply rotary positional embeddings
-        queries, keys = self.rope(queries, keys, start_pos)
-
-        if past_key_values is not None:
-            keys = torch.cat([past_key_values[0], keys], dim=1)
-            values = torch.cat([past_key_values[1], values], dim=1)
-
-        if use_cache:
-            cached_keys = keys
-            cached_values = values
-        else:
-            cached_keys = None
-            cached_values = None
+        queries, keys = apply_rope(queries, keys, rope_freqs)
 
-        queries = queries.transpose(1, 2)
-        keys = keys.transpose(1, 2)
-        values = values.transpose(1, 2)
+        if kv_cache is not None:
+            keys, values = kv_cache.update(self.layer_idx, cache_position, keys, values)
 
         apply_gqa = self.n_rep > 1
         if apply_gqa and queries.device.type == "mps":
@@ -327,21 +421,20 @@ class Attention(nn.Module):
             values = values.repeat_interleave(self.n_rep, dim=-3)
             apply_gqa = False
 
-        backends = [SDPBackend.CUDNN_ATTENTION, SDPBackend.MATH]
-
-        with sdpa_kernel(backends=backends):
+        with sdpa_kernel(backends=SDPA_BACKENDS):
             attn_output = F.scaled_dot_product_attention(
-                queries.contiguous(),
-                keys.contiguous(),
-                values.contiguous(),
-                attn_mask=mask.to(queries.dtype),
+                queries,
+                keys,
+                values,
+                attn_mask=mask,
+                is_causal=mask is None and seq_len > 1,
                 enable_gqa=apply_gqa,
             )
 
         attn_output = attn_output.transpose(1, 2).contiguous().view(bsz, seq_len, -1)
         output = self.o_proj(attn_output)
 
-        return output, (cached_keys, cached_values)
+        return output
 
 
 ########################################################
@@ -372,8 +465,9 @@ class SwiGLU(nn.Module):
         model_dim = config.d_model
         act_hidden_dim = config.activation_hidden_dim  # usually 4 * d_model
 
-        self.w_0 = nn.Linear(model_dim, act_hidden_dim, bias=False)
-        self.w_1 = nn.Linear(model_dim, act_hidden_dim, bias=False)
+        # NOTE: the gate (w_0) and up (w_1) projections are fused into a single linear layer, so
+        # that the input is read once and a single (larger) matmul is launched
+        self.w_01 = nn.Linear(model_dim, 2 * act_hidden_dim, bias=False)
         _w_2 = nn.Linear(act_hidden_dim, model_dim, bias=False)
 
         if config.rank_normalization_strategy == "spectral_weight":
@@ -381,8 +475,20 @@ class SwiGLU(nn.Module):
         else:
             self.w_2 = _w_2
 
+        self._register_load_state_dict_pre_hook(self._fuse_unfused_weights)
+
+    @staticmethod
+    def _fuse_unfused_weights(state_dict, prefix, *args) -> None:
+        """Load checkpoints with separate w_0 and w_1 projections into the fused w_01."""
+        w_0_key, w_1_key = f"{prefix}w_0.weight", f"{prefix}w_1.weight"
+        if w_0_key in state_dict and w_1_key in state_dict:
+            state_dict[f"{prefix}w_01.weight"] = torch.cat(
+                [state_dict.pop(w_0_key), state_dict.pop(w_1_key)], dim=0
+            )
+
     def forward(self, x: torch.Tensor) -> torch.Tensor:
-        return self.w_2(F.silu(self.w_0(x)) * self.w_1(x))
+        gate, up = self.w_01(x).chunk(2, dim=-1)
+        return self.w_2(F.silu(gate) * up)
 
 
 ########################################################
@@ -402,15 +508,17 @@ class PicoDecoderBlock(nn.Module):
     Args:
         config (Union[ModelConfig, PicoDecoderHFConfig]): Model configuration; either a dataclass or
             a HuggingFace PicoDecoderHFConfig
+        layer_idx (int): Index of the block in the model
     """
 
     def __init__(
         self,
         config: Union["ModelConfig", "PicoDecoderHFConfig"],
+        layer_idx: int = 0,
     ):
         super().__init__()
 
-        self.attention = Attention(config)
+        self.attention = Attention(config, layer_idx=layer_idx)
         self.swiglu = SwiGLU(config)
         self.attention_norm = RMSNorm(config)
         self.swiglu_norm = RMSNorm(config)
@@ -418,21 +526,22 @@ class PicoDecoderBlock(nn.Module):
     def forward(
         self,
         input: torch.Tensor,
+        rope_freqs: Tuple[torch.Tensor, torch.Tensor],
         mask: Optional[torch.Tensor] = None,
-        past_key_values: Optional[Tuple[torch.Tensor]] = None,
-        use_cache: bool = False,
-    ) -> Tuple[torch.Tensor, Optional[Tuple[torch.Tensor, torch.Tensor]]]:
-        attention_output, cached_key_values = self.attention(
+        kv_cache: Optional[StaticKVCache] = None,
+        cache_position: Optional[torch.Tensor] = None,
+    ) -> torch.Tensor:
+        attention_output = self.attention(
             self.attention_norm(input),
+            rope_freqs,
             mask=mask,
-            past_key_values=past_key_values,
-            use_cache=use_cache,
+            kv_cache=kv_cache,
+            cache_position=cache_position,
         )
-        # NOTE: cached_key_values is None if use_cache is False
 
         h = input + attention_output
         out = h + self.swiglu(self.swiglu_norm(h))
-        return out, cached_key_values
+        return out
 
 
 ########################################################
@@ -465,13 +574,73 @@ class PicoDecoder(nn.Module):
 
         self.embedding_proj = nn.Embedding(self.config.vocab_size, self.config.d_model)
         self.layers = nn.ModuleList(
-            [PicoDecoderBlock(self.config) for _ in range(self.config.n_layers)]
+            [
+                PicoDecoderBlock(self.config, layer_idx=idx)
+                for idx in range(self.config.n_layers)
+            ]
         )
         self.output_norm = RMSNorm(self.config)
         self.de_embedding_proj = nn.Linear(
             self.config.d_model, self.config.vocab_size, bias=False
         )
 
+        # NOTE: configs of older checkpoints do not have this flag
+        self.fp32_logits = getattr(self.config, "fp32_logits", True)
+
+        # The KV cache is only allocated once it is needed (see setup_kv_cache)
+        # NOTE: the cache is a plain attribute rather than a submodule (see setup_kv_cache)
+        self.kv_cache: Optional[StaticKVCache] = None
+
+        # The target modules of the rank normalization losses, grouped by the shape of their weight;
+        # looked up once here rather than by name at every training step.
+        # NOTE: we keep the modules (not their weights), since with spectral_weight normalization
+        # the weight is recomputed at every forward pass.
+        _target_module_groups = {}
+        for name, module in self.named_modules():
+            if any(target_module in name for target_module in self.TARGET_MODULES):
+                _target_module_groups.setdefault(module.weight.shape, []).append(module)
+        self._target_module_groups = list(_target_module_groups.values())
+
+        self.setup_buffers()
+
+    def setup_buffers(self, device: Optional[torch.device] = None) -> None:
+        """Setup the (non-persistent) buffers of the model: the RoPE tables, the causal mask and
+        (if the orthogonality loss is used) the identity matrices for the orthogonality loss.
+
+        The RoPE tables and the causal mask are built once for the maximum sequence length and
+        sliced in the forward pass, so that these are not duplicated across layers or allocated
+        per call; they can be easily recomputed so persistent=False.
+
+        NOTE: Because these buffers are not part of the state dict, this needs to be called again
+        if the model is created on the meta device and then loaded from a checkpoint.
+        """
+        max_seq_len = self.config.max_seq_len
+
+        freqs_cos, freqs_sin = setup_rope_freqs(
+            max_seq_len,
+            self.config.position_emb_theta,
+            self.config.d_model // self.config.attention_n_heads,
+            device=device,
+        )
+        self.register_buffer("freqs_cos", freqs_cos, persistent=False)
+        self.register_buffer("freqs_sin", freqs_sin, persistent=False)
+
+        # NOTE: the causal mask is boolean (True where attention is allowed), so it can be passed to
+        # attention as is, whatever the dtype of the queries, rather than cast in every layer
+        causal_mask = torch.ones(
+            (max_seq_len, max_seq_len), dtype=torch.bool, device=device
+        )
+        self.register_buffer("causal_mask", torch.tril(causal_mask), persistent=False)
+
+        # One identity matrix per input dimension of the target weights, rather than a new one
+        # per weight at every training step
+        if self.config.rank_normalization_strategy == "orthogonality_loss":
+            for _modules in self._target_module_groups:
+                d_in = _modules[0].weight.shape[1]
+                self.register_buffer(
+                    f"_eye_{d_in}", torch.eye(d_in, device=device), persistent=False
+                )
+
     def convert_to_hf_model(self) -> "PicoDecoderHF":
         """Convert the Lightning model to a HuggingFace model."""
         # Create HF config without fabric-specific settings
@@ -485,40 +654,169 @@ class PicoDecoder(nn.Module):
 
         return hf_model
 
+    def setup_kv_cache(
+        self,
+        batch_size: int,
+        dtype: Optional[torch.dtype] = None,
+        device: Optional[torch.device] = None,
+    ) -> StaticKVCache:
+        """Setup an empty static KV cache for the model.
+
+        NOTE: The cache is allocated lazily (when generation starts) rather than in __init__, since
+        the batch size used for generation is generally not the one used for training. The cache is
+        sized for max_seq_len, so that its shape does not change during generation. The cache is
+        kept on the model, and is reused (rather than reallocated) as long as the batch size, dtype
+        and device stay the same.
+
+        NOTE: By default, the cache is allocated in the compute dtype (i.e. the autocast dtype
+        under mixed precision, otherwise the dtype of the weights), so that the cached keys and
+        values can be read by attention without being cast at every decoding step.
+        """
+        weight = self.embedding_proj.weight
+        device = device if device is not None else weight.device
+        if dtype is None:
+            device_type = torch.device(device).type
+            if torch.is_autocast_enabled(device_type):
+                dtype = torch.get_autocast_dtype(device_type)
+            else:
+                dtype = weight.dtype
+
+        if self.kv_cache is None or not self.kv_cache.is_compatible(
+            batch_size, dtype, device
+        ):
+            # free the old cache before allocating the new one
+            self.kv_cache = None
+
+            # NOTE: the cache is set with object.__setattr__, since nn.Module.__setattr__ would
+            # register it as a submodule; it would then be moved, cast and traversed along with
+            # the model (e.g. by .to(), .half(), modules() and DDP/FSDP wrapping).
+            kv_cache = StaticKVCache(
+                self.config.n_layers,
+                batch_size,
+                self.config.max_seq_len,
+                self.layers[0].attention.n_kv_heads,
+                self.layers[0].attention.head_dim,
+                dtype=dtype,
+                device=device,
+            )
+            object.__setattr__(self, "kv_cache", kv_cache)
+
+        # NOTE: the old cache entries do not need to be cleared, since the mask hides every
+        # position that has not been written to (yet) in the current generation
+        self.kv_cache.seq_len = 0
+        return self.kv_cache
+
+    @torch.no_grad()
+    def decode_step(
+        self, input_ids: torch.Tensor, cache_position: torch.Tensor
+    ) -> torch.Tensor:
+        """Run a single decoding step using the KV cache of the model.
+
+        Assumes that the KV cache has been set up (see setup_kv_cache) and filled with the prompt,
+        and that input_ids holds the next token of each sequence, i.e. input_ids has shape
+        (batch_size, 1) and cache_position has shape (1,). Since the positions are passed in as a
+        tensor, every decoding step runs the exact same ops on tensors of the same shape, so this
+        step can be compiled or captured in a CUDA graph (see capture_decode_graph).
+
+        Returns:
+            The logits of the next token: (batch_size, 1, vocab_size)
+        """
+        assert self.kv_cache is not None, "KV cache is not set up, see setup_kv_cache"
+        logits, _ = self.forward(
+            input_ids, past_key_values=self.kv_cache, cache_position=cache_position
+        )
+        return logits
+
+    @torch.no_grad()
+    def capture_decode_graph(
+        self,
+        input_ids: torch.Tensor,
+        cache_position: torch.Tensor,
+        n_warmup_steps: int = 3,
+    ) -> Callable[[torch.Tensor, torch.Tensor], torch.Tensor]:
+        """Capture the decoding step (see decode_step) in a CUDA graph.
+
+        Replaying a CUDA graph launches all of the kernels of the decoding step at once, which
+        removes the Python and kernel launch overheads that dominate decoding for small models.
+
+        Returns a function with the same signature as decode_step, which copies its inputs into
+        the (static) inputs of the graph, replays the graph and returns the (static) output logits.
+
+        NOTE: The graph writes to the KV cache in place, so it stays valid for as long as the KV
+        cache of the model is not reallocated. The logits returned by the replay function are
+        overwritten by the next replay, so clone them if they need to be kept around. The warmup
+        and capture steps write to the KV cache at cache_position, so pass the next token and its
+        position (which are then simply written again by the first replay).
+        """
+        static_input_ids = input_ids.clone()
+        static_cache_position = cache_position.clone()
+
+        # warmup on a side stream, as required before capturing a graph
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            for _ in range(n_warmup_steps):
+                self.decode_step(static_input_ids, static_cache_position)
+        torch.cuda.current_stream().wait_stream(stream)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            static_logits = self.decode_step(static_input_ids, static_cache_position)
+
+        def replay(
+            input_ids: torch.Tensor, cache_position: torch.Tensor
+        ) -> torch.Tensor:
+            static_input_ids.copy_(input_ids)
+            static_cache_position.copy_(cache_position)
+            graph.replay()
+            return static_logits
+
+        return replay
+
+    def _get_target_weight_groups(self) -> List[torch.Tensor]:
+        """Get the weights of the target modules, stacked into one tensor per weight shape."""
+        return [
+            torch.stack([module.weight for module in _modules])
+            for _modules in self._target_module_groups
+        ]
+
     def get_orthogonality_loss(self) -> torch.Tensor:
-        """Get the orthogonality loss for the model."""
+        """Get the orthogonality loss for the model.
 
-        # compute the orthogonality loss for the model
-        total_loss = torch.tensor(0.0)
-        for name, module in self.named_modules():
-            if any(target_module in name for target_module in self.TARGET_MODULES):
-                _weight = module.weight
-                _gram_matrix = _weight.T @ _weight
+        NOTE: The target weights of the same shape are stacked, so that the gram matrices (and
+        their distance to the identity) of all of these weights are computed in one batched matmul.
+        """
 
-                _orthogonality_loss = torch.norm(
-                    _gram_matrix - torch.eye(len(_gram_matrix), device=_weight.device),
-                    p="fro",
+        # compute the orthogonality loss for the model
+        total_loss = torch.zeros((), device=self.embedding_proj.weight.device)
+        for _weights in self._get_target_weight_groups():
+            # _weights: (n_weights, d_out, d_in) -> _gram_matrices: (n_weights, d_in, d_in)
+            _gram_matrices = torch.bmm(_weights.transpose(1, 2), _weights)
+
+            # NOTE: the identity buffers are only set up if the orthogonality loss is used
+            _identity = getattr(self, f"_eye_{_gram_matrices.shape[-1]}", None)
+            if _identity is None:
+                _identity = torch.eye(
+                    _gram_matrices.shape[-1],
+                    dtype=_gram_matrices.dtype,
+                    device=_gram_matrices.device,
                 )
-                if _weight.device != total_loss.device:
-                    total_loss = total_loss.to(_weight.device)
-                total_loss += _orthogonality_loss
+
+            _orthogonality_losses = (
+                (_gram_matrices - _identity).pow(2).sum(dim=(1, 2)).sqrt()
+            )
+            total_loss = total_loss + _orthogonality_losses.sum()
 
         return total_loss
 
     def get_frobenius_loss(self) -> torch.Tensor:
         """Get the frobenius loss for the model."""
 
-        total_loss = torch.tensor(0.0)
         # compute the frobenius loss for the model
-        for name, module in self.named_modules():
-            if any(target_module in name for target_module in self.TARGET_MODULES):
-                _weight = module.weight
-
-                _weight_norm = torch.norm(_weight, p="fro")
-
-                if _weight.device != total_loss.device:
-                    total_loss = total_loss.to(_weight.device)
-                total_loss += _weight_norm
+        total_loss = torch.zeros((), device=self.embedding_proj.weight.device)
+        for _weights in self._get_target_weight_groups():
+            _weight_norms = torch.linalg.vector_norm(_weights, dim=(1, 2))
+            total_loss = total_loss + _weight_norms.sum()
 
         return total_loss
 
@@ -536,9 +834,10 @@ class PicoDecoder(nn.Module):
     def forward(
         self,
         input_ids: torch.Tensor,
-        past_key_values: Optional[Tuple[Tuple[torch.Tensor]]] = None,
+        past_key_values: Optional[StaticKVCache] = None,
         use_cache: bool = False,
-    ) -> Tuple[torch.Tensor, Optional[Tuple[Tuple[torch.Tensor, torch.Tensor]]]]:
+        cache_position: Optional[torch.Tensor] = None,
+    ) -> Tuple[torch.Tensor, Optional[StaticKVCache]]:
         """
         This is the forward pass for the entire Pico model. It boils down to:
         - Embedding the input ids
@@ -549,54 +848,70 @@ class PicoDecoder(nn.Module):
         NOTE: One feature that might be confusing is the KV cache. The KV cache is used to speed up
         generation by caching the KV pairs from previous forward passes. This is useful when doing
         tasks that require generating multiple tokens conditioned on previous tokens (e.g. language
-        modeling, text generation, etc.). The way the KV cache is implemented is that each layer has
-        its own KV cache which is stored as a tuple. The whole model then stores a tuple of these
-        KV caches (so a tuple of tuples).
+        modeling, text generation, etc.). The KV cache of all layers is a single pre-allocated
+        StaticKVCache that is kept on the model. If use_cache is set and no cache is passed in, a
+        new generation is started with an empty cache; the returned cache should then be passed
+        back in as past_key_values on the next call.
+
+        The cache_position (the absolute positions of the input tokens in the cache) is inferred
+        from the number of tokens seen so far, but can also be passed in as a tensor; this keeps
+        the forward pass free of Python-side shape logic (e.g. for compiled decoding), in which
+        case the caller is responsible for keeping track of the positions.
         """
 
-        seq_len = input_ids.shape[-1]
+        bsz, seq_len = input_ids.shape
         h = self.embedding_proj(input_ids)
 
-        # Calculate start position from past cached KV pairs. Remember that each layer has its
-        # own KV Cache. So when we index past_key_values, we need to index into the KV pairs for the
-        # correct layer and then for either the keys or values.
-        start_pos = 0 if past_key_values is None else past_key_values[0][0].shape[1]
-
-        # Create causal mask for current sequence
-        mask = None
-        if seq_len > 1:
-            mask = torch.full((seq_len, seq_len), float("-inf"))
-            mask = torch.triu(mask, diagonal=1)
+        if use_cache and past_key_values is None:
+            past_key_values = self.setup_kv_cache(bsz, device=h.device)
 
-            # If using KV cache, extend mask to cover cached sequence length
-            if past_key_values is not None:
-                # Add zeros for cached tokens (we can attend to all of them)
-                mask = torch.hstack([torch.zeros((seq_len, start_pos)), mask])
-
-            mask = mask.to(h.device)
+        if past_key_values is not None:
+            if cache_position is None:
+                start_pos = past_key_values.seq_len
+                cache_position = torch.arange(
+                    start_pos, start_pos + seq_len, device=h.device
+                )
+                past_key_values.seq_len = start_pos + seq_len
 
-        # NOTE: If we are using the cache, we need to store the cached KV pairs for each layer
-        #       in a tuple. Each layer will have its own cached KV pair which we aggregate in a tuple.
-        cached_key_values = () if use_cache else None
+            # The queries attend over the whole (static) cache, so each query uses the row of the
+            # causal mask at its position; this also masks out the unwritten cache positions.
+            # NOTE: this is needed even when decoding a single token.
+            mask = self.causal_mask[cache_position]
+        else:
+            # Without the cache, no explicit mask is needed: attention is told to be causal
+            # (if there is more than one token), which lets SDPA use its faster causal kernels.
+            mask = None
 
-        # Process through transformer blocks
-        for idx, layer in enumerate(self.layers):
-            layer_past_key_values = (
-                past_key_values[idx] if past_key_values is not None else None
+        # RoPE tables at the positions of the input tokens; shared by all of the layers
+        if cache_position is None:
+            rope_freqs = (self.freqs_cos[:seq_len], self.freqs_sin[:seq_len])
+        else:
+            rope_freqs = (
+                self.freqs_cos[cache_position],
+                self.freqs_sin[cache_position],
             )
 
-            h, layer_cached_key_values = layer(
-                h, mask=mask, past_key_values=layer_past_key_values, use_cache=use_cache
+        # Process through transformer blocks
+        for layer in self.layers:
+            h = layer(
+                h,
+                rope_freqs,
+                mask=mask,
+                kv_cache=past_key_values,
+                cache_position=cache_position,
             )
 
-            if use_cache:
-                cached_key_values += (layer_cached_key_values,)
-
         # Final norm and projection
         h = self.output_norm(h)
-        logits = self.de_embedding_proj(h).float()
+        logits = self.de_embedding_proj(h)
 
-        return logits, cached_key_values
+        # NOTE: by default the logits are upcast to float32 (as before); with fp32_logits=False
+        # they are left in the compute dtype (the cross entropy loss accumulates in float32
+        # internally), which halves the memory of the (large) logits tensor
+        if self.fp32_logits:
+            logits = logits.float()
+
+        return logits, past_key_values if use_cache else None
 
 
 ########################################################
@@ -662,7 +977,7 @@ class PicoDecoderHF(PreTrainedModel):
     def forward(
         self,
         input_ids: torch.Tensor,
-        past_key_values: Optional[Tuple[Tuple[torch.Tensor]]] = None,
+        past_key_values: Optional[StaticKVCache] = None,
         use_cache: bool = False,
         **kwargs,
     ) -> Union[CausalLMOutput, CausalLMOutputWithPast]:
@@ -696,14 +1011,28 @@ class PicoDecoderHF(PreTrainedModel):
         if not os.path.exists(safetensor_path):
             raise FileNotFoundError(f"Model file not found at {safetensor_path}")
 
+        # NOTE: The model is created on the meta device (so no weights are allocated or initialized)
+        # and the loaded tensors are then assigned to it as its weights, rather than copied into a
+        # freshly initialized model; this avoids holding two copies of the weights in memory.
+        with torch.device("meta"):
+            model = cls(config)
+
         # load the checkpoint
-        checkpoint = safe_open(safetensor_path, framework="pt")
-        _state_dict = {}
-        for key in checkpoint.keys():
-            _state_dict[key] = checkpoint.get_tensor(key)
+        with safe_open(safetensor_path, framework="pt") as checkpoint:
+            _state_dict = {key: checkpoint.get_tensor(key) for key in checkpoint.keys()}
+
+        # NOTE: any parameter that is not in the checkpoint would be silently left on the meta
+        # device, so these are checked for explicitly. The older unfused projections (q_proj/k_proj,
+        # w_0/w_1) are fused by the load pre-hooks, so they are not reported as missing.
+        missing_keys, _ = model.load_state_dict(_state_dict, strict=False, assign=True)
+        if missing_keys:
+            raise ValueError(
+                f"Checkpoint at {safetensor_path} is missing the keys: {missing_keys}"
+            )
 
-        model = cls(config)
-        model.load_state_dict(_state_dict, strict=False)
+        # the non-persistent buffers are not in the checkpoint, so are still on the meta device
+        _device = model.pico_decoder.embedding_proj.weight.device
+        model.pico_decoder.setup_buffers(device=_device)
         return model
 
 
@@ -20,11 +20,11 @@ import torch.nn.functional as F
 import os
 import platform
 import psutil
-import yaml
 from lightning.fabric.utilities.rank_zero import rank_zero_only
 
-from datasets import Dataset, load_dataset
-from typing import Dict, Any
+from datasets import load_dataset
+from torch.utils.data import TensorDataset
+from typing import Dict, Any, List, Tuple
 
 from src.training.utils import (
     initialize_run_dir,
@@ -40,10 +40,13 @@ from src.training.utils import (
     initialize_optimizer,
     initialize_model,
 )
-from src.training.utils.logging import pretty_print_yaml_config
+from src.training.utils.data import CUDAPrefetcher
+from src.training.utils.logging import pretty_print_yaml_config_file
 from src.checkpointing import (
     load_checkpoint,
     save_checkpoint,
+    upload_checkpoint_folder,
+    PendingUpload,
     save_evaluation_results,
     compute_learning_dynamics_states,
     save_learning_dynamics_states,
@@ -51,6 +54,12 @@ from src.checkpointing import (
 
 from src.evaluation import run_evaluation
 
+# NOTE: static information about the software setup, used in the runtime summary
+_PY_VERSION = platform.python_version()
+_OS_STR = f"{platform.system()} {platform.release()}"
+
+_BANNER = "=" * 50
+
 
 class Trainer:
     def __init__(self, config_path: str):
@@ -112,12 +121,61 @@ class Trainer:
             training_config=self.configs["training"], optimizer=self.optimizer
         )
 
+        # Compile the model (in place, so that the parameter names are unchanged)
+        # NOTE: dynamic=False, because the sequence length is fixed throughout training. The
+        # default mode is used rather than "reduce-overhead", whose CUDA graphs reuse their output
+        # buffers across steps and are not safe with the learning dynamics hooks.
+        if self.configs["training"].compile_model:
+            self.model.compile(fullgraph=False, dynamic=False)
+
         # Wrap with Fabric
         self.model, self.optimizer = self.fabric.setup(self.model, self.optimizer)
 
+        # NOTE: Config values that are read on every (sub-)step of the training loop are cached
+        # as attributes here, so that the loop does not repeatedly walk the config dicts.
+        self.gradient_accumulation_steps = self.configs[
+            "training"
+        ].optimization.gradient_accumulation_steps
+        self.max_steps = self.configs["training"].max_steps
+        self.save_every_n_steps = self.configs["checkpointing"].save_every_n_steps
+        self.log_every_n_steps = self.configs["monitoring"].logging.log_every_n_steps
+        self.rank_normalization_strategy = self.configs[
+            "model"
+        ].rank_normalization_strategy
+        self.rank_normalization_loss_weight = self.configs[
+            "model"
+        ].rank_normalization_loss_weight
+
+        # NOTE: The additional (rank-normalization) loss to compute at every sub-step is resolved
+        # once here, rather than by comparing the strategy name inside the training loop.
+        if self.rank_normalization_strategy == "orthogonality_loss":
+            self.extra_loss_fn = self.model.get_orthogonality_loss
+            self.extra_loss_name = "interval_orthogonality_loss"
+        elif self.rank_normalization_strategy == "frobenius_loss":
+            self.extra_loss_fn = self.model.get_frobenius_loss
+            self.extra_loss_name = "interval_frobenius_loss"
+        else:
+            self.extra_loss_fn = None
+            self.extra_loss_name = None
+
+        # NOTE: maps the names of the additional interval losses to their (metric name, readable
+        # name); filled in lazily when the losses are first logged
+        self.loss_display_names: Dict[str, Tuple[str, str]] = {}
+
+        # NOTE: the uploads of the checkpoints to the HuggingFace Hub run in the background; these
+        # are waited on before the next checkpoint is saved (see _wait_for_checkpoint_uploads)
+        self.pending_uploads: List[PendingUpload] = []
+
+        # NOTE: On DDP/FSDP, `fabric.no_backward_sync` skips the gradient all-reduce on all but the
+        # last sub-step of a batch. DeepSpeed does not support skipping the sync (Fabric only warns
+        # and runs the sync anyway), so we only request it when the strategy can honour it.
+        self.supports_no_backward_sync = (
+            getattr(self.fabric.strategy, "_backward_sync_control", None) is not None
+        )
+
         # Setup HuggingFace Checkpointing
         if self.configs["checkpointing"].save_to_hf:
-            initialize_hf_checkpointing(
+            self.configs["checkpointing"] = initialize_hf_checkpointing(
                 checkpointing_config=self.configs["checkpointing"], fabric=self.fabric
             )
 
@@ -158,11 +216,12 @@ class Trainer:
         #
         ########################################################
 
-        self.train_dataset, fast_forward_steps = initialize_dataset(
+        # NOTE: The dataset is already fast-forwarded to the correct step, so that we continue
+        # from the batch of data we would have seen had training not previously stopped.
+        self.train_dataset = initialize_dataset(
             data_config=self.configs["data"],
             fabric=self.fabric,
             initial_batch_step=self.initial_batch_step,
-            return_fast_forward_steps=True,
         )
 
         self.train_dataloader = initialize_dataloader(
@@ -171,27 +230,24 @@ class Trainer:
             fabric=self.fabric,
             dataset=self.train_dataset,
         )
+        # NOTE: On GPU, the batches are moved to the device by a prefetcher (see below) rather
+        # than by Fabric, so that the copy of the next batch overlaps with the current step.
+        use_cuda_prefetcher = self.fabric.device.type == "cuda"
         self.train_dataloader = self.fabric.setup_dataloaders(
-            self.train_dataloader, use_distributed_sampler=False
+            self.train_dataloader,
+            use_distributed_sampler=False,
+            move_to_device=not use_cuda_prefetcher,
         )
 
         self.tokenizer = initialize_tokenizer(data_config=self.configs["data"])
 
-        # NOTE: We may need to fast-forward the iterator to the correct step so that we can
-        # continue from the correct batch of data we would have seen had training not
-        # previously stopped.
-        train_iterator = iter(self.train_dataloader)
-        if fast_forward_steps > 0:
-            fast_forward_sub_steps = (
-                fast_forward_steps
-                * self.configs["training"].optimization.gradient_accumulation_steps
+        self.train_iterator = iter(self.train_dataloader)
+        if use_cuda_prefetcher:
+            self.train_iterator = CUDAPrefetcher(
+                self.train_iterator, self.fabric.device
             )
-            for _ in range(fast_forward_sub_steps):
-                next(train_iterator)
-
-        self.train_iterator = train_iterator
 
-        # NOTE: Sychronizing processes after fast-forwarding iterator
+        # NOTE: Sychronizing processes after setting up the data iterator
         self.fabric.barrier()
 
         ########################################################
@@ -220,6 +276,49 @@ class Trainer:
             else:
                 self.learning_dynamics_eval_dataset = None
 
+        ########################################################
+        #
+        # Runtime information (logged in the runtime summary)
+        #
+        ########################################################
+
+        # NOTE: The hardware probes and parameter counts don't change during training, so they are
+        # computed once here; the parameter counts are accumulated in a single pass. Only rank 0
+        # logs the runtime summary, so the other ranks skip the probes (but the attributes are
+        # defined on every rank, as None).
+        self.total_params = None
+        self.trainable_params = None
+        self.total_params_str = None
+        self.trainable_params_str = None
+        self.device_type = None
+        self.available_memory_gb = None
+
+        if self.fabric.global_rank == 0:
+            self.total_params = 0
+            self.trainable_params = 0
+            for param in self.model.parameters():
+                self.total_params += param.numel()
+                if param.requires_grad:
+                    self.trainable_params += param.numel()
+            self.total_params_str = f"{self.total_params:,}"
+            self.trainable_params_str = f"{self.trainable_params:,}"
+
+            fabric_device = str(self.fabric.device)
+            if torch.cuda.is_available() and "cuda" in fabric_device:
+                self.device_type = torch.cuda.get_device_name(self.fabric.device)
+            elif torch.backends.mps.is_available() and "mps" in fabric_device:
+                self.device_type = "MPS (Apple Silicon)"
+            else:
+                self.device_type = "CPU"
+
+            if self.fabric.device.type == "cuda":
+                self.available_memory_gb = (
+                    torch.cuda.get_device_properties(self.fabric.device).total_memory
+                    / 1e9
+                )
+            else:
+                self.available_memory_gb = psutil.virtual_memory().total / 1e9
+
     def train(self) -> None:
         """Execute the main training workflow.
 
@@ -240,7 +339,7 @@ class Trainer:
         ########################################################
 
         # Save Initial Checkpoint -- If the checkpoint already exists, this performs a no-op
-        save_checkpoint(
+        self.pending_uploads = save_checkpoint(
             configs=self.configs,
             checkpoint_step=self.initial_batch_step,
             fabric=self.fabric,
@@ -297,7 +396,7 @@ class Trainer:
         #
         ########################################################
 
-        if self.initial_batch_step < self.configs["training"].max_steps:
+        if self.initial_batch_step < self.max_steps:
             self._log_training_configuration()
             final_step = self._training_loop()
         else:
@@ -329,9 +428,10 @@ class Trainer:
                 )
 
         # Handle checkpointing and final evaluation
-        if final_step % self.configs["checkpointing"].save_every_n_steps != 0:
+        if final_step % self.save_every_n_steps != 0:
             self.log(f"Step {final_step} -- 💾 Saving Final Checkpoint")
-            save_checkpoint(
+            self._wait_for_checkpoint_uploads()
+            self.pending_uploads = save_checkpoint(
                 configs=self.configs,
                 checkpoint_step=final_step,
                 fabric=self.fabric,
@@ -357,18 +457,21 @@ class Trainer:
                     evaluation_results=evaluation_results,
                 )
 
+        # NOTE: checkpoint uploads to the HuggingFace Hub run in the background
+        self._wait_for_checkpoint_uploads()
+
         self.log(f"🎉 Training complete! Final step: {final_step}")
 
-        if final_step < self.configs["training"].max_steps:
+        if final_step < self.max_steps:
             self.log(
-                f"\t Note: Training stopped before max steps ({self.configs['training'].max_steps})",
+                f"\t Note: Training stopped before max steps ({self.max_steps})",
                 level=logging.WARNING,
             )
 
         # Cleanup distributed training
         self.fabric.barrier()
+        # NOTE: We don't empty the CUDA cache here; the memory is freed when the process exits
         if torch.cuda.is_available():
-            torch.cuda.empty_cache()
             if torch.distributed.is_initialized():
                 torch.distributed.destroy_process_group()
 
@@ -394,27 +497,23 @@ class Trainer:
         """
         # Setup training loop variables
         batch_step = self.initial_batch_step
+        device = self.fabric.device
 
         # NOTE: these are used to compute the average loss over a training interval.
         # This is more accurate than using the loss at the end of the interval.
-        interval_loss = torch.tensor(0.0, device=self.fabric.device)
-        interval_steps = torch.tensor(0, device=self.fabric.device)
-        interval_inf_or_nan_count = torch.tensor(0, device=self.fabric.device)
-
-        if self.configs["model"].rank_normalization_strategy == "orthogonality_loss":
-            interval_orthogonality_loss = torch.tensor(0.0, device=self.fabric.device)
-        elif self.configs["model"].rank_normalization_strategy == "frobenius_loss":
-            interval_frobenius_loss = torch.tensor(0.0, device=self.fabric.device)
+        interval_loss = torch.tensor(0.0, device=device)
+        interval_steps = torch.tensor(0, device=device)
+        interval_inf_or_nan_count = torch.tensor(0, device=device)
+        interval_extra_loss = torch.tensor(0.0, device=device)
 
         if self.should_compute_learning_dynamics:
-            # NOTE: we basically re-construct the full batch here so that we can compute learning dynamics
+            # NOTE: we basically re-construct the full batch here so that we can compute learning dynamics;
+            # stored as a list of CPU tensors (one per sub-batch) that is concatenated at the
+            # checkpointing step
             training_batch = {"input_ids": []}
 
         # NOTE: determine what sub-batch we should start from
-        initial_sub_batch_step = (
-            batch_step
-            * self.configs["training"].optimization.gradient_accumulation_steps
-        )
+        initial_sub_batch_step = batch_step * self.gradient_accumulation_steps
 
         ###############################################################
         #
@@ -432,7 +531,7 @@ class Trainer:
             # NOTE: We want to store the entire training batch whenever we are computing learning dynamics
             # and we are at a checkpointing step.
             should_store_training_batch = self.should_compute_learning_dynamics and (
-                batch_step % self.configs["checkpointing"].save_every_n_steps == 0
+                batch_step % self.save_every_n_steps == 0
             )
 
             ########################################################
@@ -441,11 +540,13 @@ class Trainer:
             #
             ########################################################
 
-            _input_ids = torch.tensor(sub_batch["input_ids"], device=self.fabric.device)
-            input_ids = _input_ids[:, :-1]
-            labels = _input_ids[:, 1:]
+            # NOTE: the batch is already a pinned tensor, so the copy does not block the host
+            input_ids = sub_batch["input_ids"].to(device, non_blocking=True)
+            labels = sub_batch["labels"].to(device, non_blocking=True)
 
             if should_store_training_batch:
+                # NOTE: the full sequence is the inputs followed by the last label
+                _input_ids = torch.cat([input_ids, labels[:, -1:]], dim=1)
                 gathered_input_ids = self.fabric.all_gather(_input_ids)
 
                 # NOTE: On multi-GPU, we need to reshape the input_ids to be a 2D tensor; on
@@ -455,7 +556,11 @@ class Trainer:
                         -1, *gathered_input_ids.shape[2:]
                     )
 
-                training_batch["input_ids"].extend(gathered_input_ids.tolist())
+                # NOTE: non-blocking copy into pinned host memory; we only synchronize with the
+                # device once the full training batch is needed at the checkpointing step.
+                training_batch["input_ids"].append(
+                    gathered_input_ids.to("cpu", non_blocking=True)
+                )
 
             # Forward pass
             model_output, _ = self.model(input_ids)
@@ -467,58 +572,48 @@ class Trainer:
             #
             ########################################################
 
-            should_accumulate_gradients = (sub_batch_step + 1) % self.configs[
-                "training"
-            ].optimization.gradient_accumulation_steps != 0
+            should_accumulate_gradients = (
+                sub_batch_step + 1
+            ) % self.gradient_accumulation_steps != 0
 
             with self.fabric.no_backward_sync(
-                self.model, enabled=should_accumulate_gradients
+                self.model,
+                enabled=should_accumulate_gradients and self.supports_no_backward_sync,
             ):
-                loss = F.cross_entropy(model_output, labels)
-
-                # Compute special losses (orthogonality, frobenius, normalization)
-                if (
-                    self.configs["model"].rank_normalization_strategy
-                    == "orthogonality_loss"
-                ):
-                    orthogonality_loss = (
-                        self.model.get_orthogonality_loss()
-                        * self.configs["model"].rank_normalization_loss_weight
+                # NOTE: The loss is summed (rather than averaged) over the tokens of the sub-batch,
+                # so that the per-token normalization and the gradient accumulation scaling can be
+                # applied as a single constant factor in the backward pass.
+                num_tokens = labels.numel()
+                loss = F.cross_entropy(model_output, labels, reduction="sum")
+
+                # Compute special losses (orthogonality, frobenius)
+                # NOTE: these are computed outside of autocast, so the Gram matrices (whose
+                # distance to the identity is sensitive to rounding) are kept in fp32
+                if self.extra_loss_fn is not None:
+                    extra_loss = (
+                        self.extra_loss_fn() * self.rank_normalization_loss_weight
                     )
-
-                    loss += orthogonality_loss.to(loss.device)
-                elif (
-                    self.configs["model"].rank_normalization_strategy
-                    == "frobenius_loss"
-                ):
-                    frobenius_loss = (
-                        self.model.get_frobenius_loss()
-                        * self.configs["model"].rank_normalization_loss_weight
-                    )
-                    loss += frobenius_loss.to(loss.device)
+                    loss += extra_loss * num_tokens
 
                 self.fabric.backward(
-                    loss
-                    / self.configs["training"].optimization.gradient_accumulation_steps,
+                    loss * (1.0 / (num_tokens * self.gradient_accumulation_steps)),
                     model=self.model,
                 )
 
-                if torch.isnan(loss) or torch.isinf(loss):
-                    interval_inf_or_nan_count += 1
-                else:
-                    interval_loss += loss.item()
-                    interval_steps += 1
-
-                    if (
-                        self.configs["model"].rank_normalization_strategy
-                        == "orthogonality_loss"
-                    ):
-                        interval_orthogonality_loss += orthogonality_loss.item()
-                    elif (
-                        self.configs["model"].rank_normalization_strategy
-                        == "frobenius_loss"
-                    ):
-                        interval_frobenius_loss += frobenius_loss.item()
+                # NOTE: The interval statistics are accumulated on the device, masking out inf/NaN
+                # losses, so that we don't have to synchronize with the host on every sub-step.
+                loss_is_finite = torch.isfinite(loss.detach())
+                interval_loss.add_(
+                    torch.where(loss_is_finite, loss.detach(), 0.0),
+                    alpha=1.0 / num_tokens,
+                )
+                interval_steps += loss_is_finite.long()
+                interval_inf_or_nan_count += (~loss_is_finite).long()
+
+                if self.extra_loss_fn is not None:
+                    interval_extra_loss += torch.where(
+                        loss_is_finite, extra_loss.detach(), 0.0
+                    )
 
             # NOTE: if we are not accumulating gradients, we should skip the logging and optimization steps
             if should_accumulate_gradients:
@@ -530,41 +625,24 @@ class Trainer:
             #
             ########################################################
 
-            if batch_step % self.configs["monitoring"].logging.log_every_n_steps == 0:
+            if batch_step % self.log_every_n_steps == 0:
                 self._log_training_metrics(
                     interval_loss=interval_loss,
                     interval_steps=interval_steps,
                     interval_inf_or_nan_count=interval_inf_or_nan_count,
                     batch_step=batch_step,
-                    **{
-                        "interval_orthogonality_loss": interval_orthogonality_loss
-                        if self.configs["model"].rank_normalization_strategy
-                        == "orthogonality_loss"
-                        else None,
-                        "interval_frobenius_loss": interval_frobenius_loss
-                        if self.configs["model"].rank_normalization_strategy
-                        == "frobenius_loss"
-                        else None,
-                    },
+                    **(
+                        {self.extra_loss_name: interval_extra_loss}
+                        if self.extra_loss_fn is not None
+                        else {}
+                    ),
                 )
-                interval_loss = torch.tensor(0.0, device=self.fabric.device)
-                interval_steps = torch.tensor(0, device=self.fabric.device)
-                interval_inf_or_nan_count = torch.tensor(0, device=self.fabric.device)
-
-                if (
-                    self.configs["model"].rank_normalization_strategy
-                    == "orthogonality_loss"
-                ):
-                    interval_orthogonality_loss = torch.tensor(
-                        0.0, device=self.fabric.device
-                    )
-                elif (
-                    self.configs["model"].rank_normalization_strategy
-                    == "frobenius_loss"
-                ):
-                    interval_frobenius_loss = torch.tensor(
-                        0.0, device=self.fabric.device
-                    )
+
+                # NOTE: resetting the interval statistics in place, rather than re-allocating them
+                interval_loss.zero_()
+                interval_steps.zero_()
+                interval_inf_or_nan_count.zero_()
+                interval_extra_loss.zero_()
 
             ########################################################
             #
@@ -572,50 +650,15 @@ class Trainer:
             #
             ########################################################
 
-            if batch_step % self.configs["checkpointing"].save_every_n_steps == 0:
-                if self.should_compute_learning_dynamics:
-                    self.log(f"Step {batch_step} -- 📈 Saving Learning Dynamics")
-
-                    # Training Batch Learning Dynamics
-                    training_batch_dataset = Dataset.from_dict(training_batch)
-
-                    learning_dynamics_train_states = compute_learning_dynamics_states(
-                        checkpointing_config=self.configs["checkpointing"],
-                        fabric=self.fabric,
-                        model=self.model,
-                        dataset=training_batch_dataset,
-                        compute_gradients=True,
-                    )
-
-                    save_learning_dynamics_states(
-                        checkpointing_config=self.configs["checkpointing"],
-                        checkpoint_step=batch_step,
-                        prefix="train",
-                        fabric=self.fabric,
-                        learning_dynamics_states=learning_dynamics_train_states,
-                        learning_dynamics_dataset=training_batch_dataset,
-                        tokenizer=self.tokenizer,
-                    )
-                    training_batch = {
-                        "input_ids": []
-                    }  # Resetting training_batch for next training batch
-
-                    # Validation Data Learning Dynamics
-                    if self.learning_dynamics_eval_dataset is not None:
-                        learning_dynamics_val_states = compute_learning_dynamics_states(
-                            checkpointing_config=self.configs["checkpointing"],
-                            fabric=self.fabric,
-                            model=self.model,
-                            dataset=self.learning_dynamics_eval_dataset,
-                            compute_gradients=True,
-                        )
-                        save_learning_dynamics_states(
-                            checkpointing_config=self.configs["checkpointing"],
-                            checkpoint_step=batch_step,
-                            prefix="val",
-                            fabric=self.fabric,
-                            learning_dynamics_states=learning_dynamics_val_states,
-                        )
+            # NOTE: checking the flag first, so that the default case (no learning dynamics)
+            # does not pay for the rest of the check on every step
+            if (
+                self.should_compute_learning_dynamics
+                and batch_step % self.save_every_n_steps == 0
+            ):
+                self._save_learning_dynamics(batch_step, training_batch["input_ids"])
+                # Resetting training_batch for next training batch
+                training_batch["input_ids"] = []
 
             ########################################################
             #
@@ -624,7 +667,7 @@ class Trainer:
             ########################################################
 
             self.optimizer.step()
-            self.optimizer.zero_grad()
+            self.optimizer.zero_grad(set_to_none=True)
             self.lr_scheduler.step()
 
             batch_step += 1
@@ -635,9 +678,10 @@ class Trainer:
             #
             ########################################################
 
-            if batch_step % self.configs["checkpointing"].save_every_n_steps == 0:
+            if batch_step % self.save_every_n_steps == 0:
                 self.log(f"Step {batch_step} -- 💾 Saving Checkpoint")
-                save_checkpoint(
+                self._wait_for_checkpoint_uploads()
+                self.pending_uploads = save_checkpoint(
                     configs=self.configs,
                     checkpoint_step=batch_step,
                     fabric=self.fabric,
@@ -664,11 +708,81 @@ class Trainer:
                         )
 
             # Break if we've reached training steps
-            if batch_step >= self.configs["training"].max_steps:
+            if batch_step >= self.max_steps:
                 break
 
         return batch_step
 
+    def _wait_for_checkpoint_uploads(self) -> None:
+        """
+        Waits for the background checkpoint uploads to the HuggingFace Hub to finish.
+
+        NOTE: A failed upload is logged and then uploaded again (in the foreground, with backoff),
+        rather than being re-raised from within the next (retried) save_checkpoint call, where the
+        failed upload would be lost.
+        """
+        for future, upload_kwargs in self.pending_uploads:
+            try:
+                future.result()
+            except Exception as e:
+                upload_name = upload_kwargs["commit_message"]
+                self.log(
+                    f"⚠️ {upload_name} -- upload failed, retrying: {e}",
+                    level=logging.WARNING,
+                )
+                upload_checkpoint_folder(upload_kwargs)
+        self.pending_uploads = []
+
+    def _save_learning_dynamics(
+        self, batch_step: int, training_batch_input_ids: List[torch.Tensor]
+    ) -> None:
+        """
+        Computes and saves the learning dynamics states of the model on the given training batch
+        (a list of CPU tensors of input ids, one per sub-batch) and on the learning dynamics
+        evaluation dataset (if configured).
+        """
+        self.log(f"Step {batch_step} -- 📈 Saving Learning Dynamics")
+
+        # Training Batch Learning Dynamics
+        if self.fabric.device.type == "cuda":
+            torch.cuda.current_stream(self.fabric.device).synchronize()
+        training_batch_dataset = TensorDataset(torch.cat(training_batch_input_ids))
+
+        learning_dynamics_train_states = compute_learning_dynamics_states(
+            checkpointing_config=self.configs["checkpointing"],
+            fabric=self.fabric,
+            model=self.model,
+            dataset=training_batch_dataset,
+            compute_gradients=True,
+        )
+
+        save_learning_dynamics_states(
+            checkpointing_config=self.configs["checkpointing"],
+            checkpoint_step=batch_step,
+            prefix="train",
+            fabric=self.fabric,
+            learning_dynamics_states=learning_dynamics_train_states,
+            learning_dynamics_dataset=training_batch_dataset,
+            tokenizer=self.tokenizer,
+        )
+
+        # Validation Data Learning Dynamics
+        if self.learning_dynamics_eval_dataset is not None:
+            learning_dynamics_val_states = compute_learning_dynamics_states(
+                checkpointing_config=self.configs["checkpointing"],
+                fabric=self.fabric,
+                model=self.model,
+                dataset=self.learning_dynamics_eval_dataset,
+                compute_gradients=True,
+            )
+            save_learning_dynamics_states(
+                checkpointing_config=self.configs["checkpointing"],
+                checkpoint_step=batch_step,
+                prefix="val",
+                fabric=self.fabric,
+                learning_dynamics_states=learning_dynamics_val_states,
+            )
+
     ########################################################
     #
     # Trainer Logging Functinalities
@@ -687,23 +801,43 @@ class Trainer:
         Gathers together the training metrics computed across all processes in distributed training
         and logs them in a tree-style format.
         """
-        gathered_interval_loss = self.fabric.all_reduce(
-            interval_loss, reduce_op="sum"
-        ).item()
-        gathered_interval_inf_or_nan_count = self.fabric.all_reduce(
-            interval_inf_or_nan_count, reduce_op="sum"
-        ).item()
-        gathered_interval_steps = self.fabric.all_reduce(
-            interval_steps, reduce_op="sum"
-        ).item()
-
-        gathered_avg_additional_losses = {}
-        for loss_name, loss_value in additional_losses.items():
-            if loss_value is not None:
-                gathered_avg_additional_losses[loss_name] = (
-                    self.fabric.all_reduce(loss_value, reduce_op="sum").item()
-                    / gathered_interval_steps
-                )
+        additional_losses = {
+            loss_name: loss_value
+            for loss_name, loss_value in additional_losses.items()
+            if loss_value is not None
+        }
+
+        # NOTE: All of the metrics are stacked into a single tensor, so that they can be reduced
+        # across processes with a single collective (and copied to the host with a single sync).
+        stacked_metrics = torch.stack(
+            [
+                interval_loss.float(),
+                interval_inf_or_nan_count.float(),
+                interval_steps.float(),
+                *(loss_value.float() for loss_value in additional_losses.values()),
+            ]
+        )
+        (
+            gathered_interval_loss,
+            gathered_interval_inf_or_nan_count,
+            gathered_interval_steps,
+            *gathered_additional_losses,
+        ) = self.fabric.all_reduce(stacked_metrics, reduce_op="sum").tolist()
+
+        # NOTE: Only rank 0 logs; the other ranks only need to take part in the all_reduce above,
+        # so they can skip formatting the metrics altogether.
+        if self.fabric.global_rank != 0:
+            return
+
+        gathered_interval_inf_or_nan_count = int(gathered_interval_inf_or_nan_count)
+        gathered_interval_steps = int(gathered_interval_steps)
+
+        gathered_avg_additional_losses = {
+            loss_name: loss_value / gathered_interval_steps
+            for loss_name, loss_value in zip(
+                additional_losses.keys(), gathered_additional_losses
+            )
+        }
 
         avg_loss = (
             gathered_interval_loss / gathered_interval_steps
@@ -717,18 +851,23 @@ class Trainer:
             gathered_interval_inf_or_nan_count,
             step=batch_step,
         )
-        self.fabric.log(
-            "trainer/learning_rate",
-            self.lr_scheduler.get_last_lr()[0],
-            step=batch_step,
-        )
+        # NOTE: the scheduler writes the current learning rate into the optimizer's param groups,
+        # so we read it from there rather than building a new list with get_last_lr()
+        learning_rate = self.optimizer.param_groups[0]["lr"]
+        self.fabric.log("trainer/learning_rate", learning_rate, step=batch_step)
 
         ce_loss = avg_loss
 
         for loss_name, loss_value in gathered_avg_additional_losses.items():
-            self.fabric.log(
-                f"train/{loss_name.split('interval_')[1]}", loss_value, step=batch_step
-            )
+            if loss_name not in self.loss_display_names:
+                # e.g. interval_orthogonality_loss -> orthogonality_loss, Orthogonality Loss
+                metric_name = loss_name.split("interval_")[1]
+                self.loss_display_names[loss_name] = (
+                    metric_name,
+                    " ".join(word.capitalize() for word in metric_name.split("_")),
+                )
+            metric_name, _ = self.loss_display_names[loss_name]
+            self.fabric.log(f"train/{metric_name}", loss_value, step=batch_step)
             ce_loss -= loss_value
 
         self.fabric.log("train/ce_loss", ce_loss, step=batch_step)
@@ -737,16 +876,10 @@ class Trainer:
         self.log(f"Step {batch_step} -- 🔄 Training Metrics")
         self.log(f"├── Total Loss: {avg_loss:.4f}")
         for loss_name, loss_value in gathered_avg_additional_losses.items():
-            # Making the loss name more readable
-            _loss_name_split = loss_name.split("interval_")[1].split("_")
-            _loss_name = (
-                _loss_name_split[0].capitalize()
-                + " "
-                + _loss_name_split[1].capitalize()
-            )
+            _, _loss_name = self.loss_display_names[loss_name]
             self.log(f"├── {_loss_name}: {loss_value:.4f}")
         self.log(f"├── CE Loss: {ce_loss:.4f}")
-        self.log(f"├── Learning Rate: {self.lr_scheduler.get_last_lr()[0]:.2e}")
+        self.log(f"├── Learning Rate: {learning_rate:.2e}")
         self.log(f"└── Inf/NaN count: {gathered_interval_inf_or_nan_count}")
 
     def _log_evaluation_results(
@@ -758,7 +891,15 @@ class Trainer:
             for i, (metric, result) in enumerate(evaluation_results.items()):
                 prefix = "└──" if i == len(evaluation_results) - 1 else "├──"
                 self.log(f"{prefix} {metric}: {result}")
-                self.fabric.log(f"eval/{metric}", result, step=batch_step)
+
+            # NOTE: logging all of the metrics with a single call to the experiment tracker
+            self.fabric.log_dict(
+                {
+                    f"eval/{metric}": result
+                    for metric, result in evaluation_results.items()
+                },
+                step=batch_step,
+            )
 
     def _log_training_configuration(self):
         """
@@ -767,70 +908,52 @@ class Trainer:
 
         This function is called at the beginning of the training loop to provide a summary of the
         training configuration.
+
+        NOTE: Only rank 0 logs, so the other ranks return immediately.
         """
+        if self.fabric.global_rank != 0:
+            return
 
-        total_params = sum(p.numel() for p in self.model.parameters())
-        trainable_params = sum(
-            p.numel() for p in self.model.parameters() if p.requires_grad
-        )
         global_batch_size = self.configs["data"].dataloader.batch_size
         per_device_batch_size = self.train_dataloader.batch_size
-        gradient_accumulation_steps = self.configs[
-            "training"
-        ].optimization.gradient_accumulation_steps
-
-        device_type = ""
-        fabric_device = str(self.fabric.device)
-        if torch.cuda.is_available() and "cuda" in fabric_device:
-            device_type = torch.cuda.get_device_name(self.fabric.device)
-        elif torch.backends.mps.is_available() and "mps" in fabric_device:
-            device_type = "MPS (Apple Silicon)"
-        else:
-            device_type = "CPU"
+        gradient_accumulation_steps = self.gradient_accumulation_steps
 
         training_config_path = os.path.join(
-            self.configs["checkpointing"].runs_dir,
-            self.configs["checkpointing"].run_name,
-            "training_config.yaml",
+            self.configs["checkpointing"].run_path, "training_config.yaml"
         )
         if os.path.exists(training_config_path):
-            self.log("=" * 50)
+            self.log(_BANNER)
             self.log("✨ Training Configuration")
-            self.log("=" * 50)
-            training_config = yaml.safe_load(open(training_config_path, "r"))
-            pretty_print_yaml_config(self.logger, training_config)
-
-        self.log("=" * 50)
-        self.log("⛭ Runtime Summary:")
-        self.log("=" * 50)
-        self.log(f"Starting from step: {self.initial_batch_step}")
-
-        self.log("Model Setup:")
-        self.log(f"└─ Total Parameters: {total_params:,}")
-        self.log(f"└─ Trainable Parameters: {trainable_params:,}")
-
-        self.log("Distributed Setup:")
-        self.log(f"└─ Number of Devices: {self.fabric.world_size}")
-        self.log(f"└─ Device Type: {device_type}")
-        self.log(
-            f"└─ Available Memory: {torch.cuda.get_device_properties(0).total_memory / 1e9:.2f} GB"
-            if torch.cuda.is_available()
-            else f"└─ Available Memory: {psutil.virtual_memory().total / 1e9:.2f} GB"
-        )
-
-        self.log("Software Setup:")
-        self.log(f"└─ Python Version: {platform.python_version()}")
-        self.log(f"└─ PyTorch Version: {torch.__version__}")
-        self.log(
-            f"└─ CUDA Version: {torch.version.cuda if torch.cuda.is_available() else 'N/A'}"
-        )
-        self.log(f"└─ Operating System: {platform.system()} {platform.release()}")
-
-        self.log("Batch Size Configuration:")
-        self.log(f"└─ Global Batch Size: {global_batch_size}")
-        self.log(f"└─ Per Device Batch Size: {per_device_batch_size}")
-        self.log(f"└─ Gradient Accumulation Steps: {gradient_accumulation_steps}")
-        self.log("=" * 50)
+            self.log(_BANNER)
+            pretty_print_yaml_config_file(self.logger, training_config_path)
+
+        # NOTE: Each line of the runtime summary is logged as its own record, so that the log
+        # stays parseable line by line (e.g. with grep).
+        runtime_summary = [
+            _BANNER,
+            "⛭ Runtime Summary:",
+            _BANNER,
+            f"Starting from step: {self.initial_batch_step}",
+            "Model Setup:",
+            f"└─ Total Parameters: {self.total_params_str}",
+            f"└─ Trainable Parameters: {self.trainable_params_str}",
+            "Distributed Setup:",
+            f"└─ Number of Devices: {self.fabric.world_size}",
+            f"└─ Device Type: {self.device_type}",
+            f"└─ Available Memory: {self.available_memory_gb:.2f} GB",
+            "Software Setup:",
+            f"└─ Python Version: {_PY_VERSION}",
+            f"└─ PyTorch Version: {torch.__version__}",
+            f"└─ CUDA Version: {torch.version.cuda if torch.cuda.is_available() else 'N/A'}",
+            f"└─ Operating System: {_OS_STR}",
+            "Batch Size Configuration:",
+            f"└─ Global Batch Size: {global_batch_size}",
+            f"└─ Per Device Batch Size: {per_device_batch_size}",
+            f"└─ Gradient Accumulation Steps: {gradient_accumulation_steps}",
+            _BANNER,
+        ]
+        for line in runtime_summary:
+            self.log(line)
 
     @rank_zero_only
     def log(self, msg: str, level: int = logging.INFO) -> None:
@@ -15,6 +15,7 @@ from .initialization import (
     initialize_hf_checkpointing,
     initialize_wandb,
     initialize_logging,
+    flush_logging,
     initialize_optimizer,
     initialize_model,
 )
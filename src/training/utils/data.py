@@ -2,6 +2,7 @@
 Utilities for data loading and processing.
 """
 
+import torch
 from torch.utils.data import IterableDataset
 
 
@@ -33,3 +34,51 @@ class ShardedIterableDataset(IterableDataset):
                     next(iterator)
             except StopIteration:
                 break
+
+
+class CUDAPrefetcher:
+    """
+    Wraps a dataloader iterator and copies the next batch to the GPU on a separate CUDA stream,
+    so that the host-to-device copy of the next batch overlaps with the computation on the
+    current one.
+
+    NOTE: Expects the dataloader to yield dicts of (pinned) tensors; otherwise the copy is not
+    asynchronous.
+    """
+
+    def __init__(self, iterator, device):
+        self.iterator = iterator
+        self.device = device
+        self.stream = torch.cuda.Stream(device=device)
+        self._preload()
+
+    def _preload(self):
+        try:
+            batch = next(self.iterator)
+        except StopIteration:
+            self.next_batch = None
+            return
+
+        with torch.cuda.stream(self.stream):
+            self.next_batch = {
+                key: value.to(self.device, non_blocking=True)
+                for key, value in batch.items()
+            }
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.next_batch is None:
+            raise StopIteration
+
+        # NOTE: The compute stream has to wait for the copy to finish; we also record the tensors
+        # on the compute stream so that their memory is not reused while still in use there.
+        current_stream = torch.cuda.current_stream(self.device)
+        current_stream.wait_stream(self.stream)
+        batch = self.next_batch
+        for value in batch.values():
+            value.record_stream(current_stream)
+
+        self._preload()
+        return batch
@@ -12,10 +12,13 @@ more experimental stuff to you.
 import lightning as L
 import torch
 import os
+import atexit
 import logging
-import yaml
-from dataclasses import fields, is_dataclass
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from dataclasses import fields, is_dataclass, replace
 from datetime import datetime
+from functools import lru_cache
 import wandb
 from huggingface_hub import add_collection_item, create_repo, create_branch
 from wandb.integration.lightning.fabric import WandbLogger
@@ -23,7 +26,7 @@ from datasets import load_dataset, Dataset, DownloadConfig
 from datasets import config as datasets_config
 from torch.utils.data import DataLoader
 from transformers import AutoTokenizer
-from typing import Optional, Dict, Union
+from typing import Optional, Dict, Tuple, Union
 import warnings
 
 from src.config import (
@@ -39,7 +42,7 @@ from src.model import PicoDecoder
 
 from lightning.fabric.loggers import Logger as FabricLogger
 
-from src.training.utils.io import use_backoff
+from src.training.utils.io import use_backoff, load_yaml
 
 warnings.filterwarnings(
     "ignore",
@@ -57,24 +60,39 @@ warnings.filterwarnings(
 ########################################################
 
 
+@lru_cache(maxsize=None)
+def _get_init_field_names(config_cls: type) -> Tuple[str, ...]:
+    """Names of the fields of a config dataclass that can be set via its constructor.
+
+    NOTE: Cached per class, so the dataclass fields are only introspected once rather than on
+    every (recursive) application of config overrides.
+    """
+    return tuple(field.name for field in fields(config_cls) if field.init)
+
+
 def _apply_config_overrides(config, overrides: dict):
     """Recursively apply configuration overrides to a dataclass config object.
 
+    NOTE: Some of the configs are frozen, so rather than setting attributes in place we build a
+    new config object with the overrides applied.
+
     Args:
         config: Base configuration object (must be a dataclass)
         overrides: Dictionary of override values matching config structure
 
     Returns:
-        Modified config object with overrides to the config.
+        New config object with overrides to the config.
     """
-    for field in fields(config):
-        field_value = getattr(config, field.name)
+    changes = {}
+    for field_name in _get_init_field_names(type(config)):
+        field_value = getattr(config, field_name)
         if is_dataclass(field_value):
-            _apply_config_overrides(field_value, overrides.get(field.name, {}))
-        else:
-            if field.name in overrides:
-                setattr(config, field.name, overrides[field.name])
-    return config
+            changes[field_name] = _apply_config_overrides(
+                field_value, overrides.get(field_name, {})
+            )
+        elif field_name in overrides:
+            changes[field_name] = overrides[field_name]
+    return replace(config, **changes)
 
 
 def initialize_configuration(
@@ -96,6 +114,9 @@ def initialize_configuration(
     any overrides from the config_path file. If no config_path is provided,
     the function will use the default configuration objects.
 
+    NOTE: If no run name is specified in the checkpointing config, a timestamp-based name is
+    generated here (the checkpointing config is frozen, so it cannot be set later on).
+
     Args:
         config_path: Path to a YAML file containing configuration overrides.
 
@@ -110,7 +131,7 @@ def initialize_configuration(
     checkpointing_config = CheckpointingConfig()
 
     if config_path:
-        overrides = yaml.safe_load(open(config_path, "r"))
+        overrides = load_yaml(config_path)
         data_config = _apply_config_overrides(data_config, overrides.get("data", {}))
         model_config = _apply_config_overrides(model_config, overrides.get("model", {}))
         training_config = _apply_config_overrides(
@@ -126,6 +147,12 @@ def initialize_configuration(
             checkpointing_config, overrides.get("checkpointing", {})
         )
 
+    if not checkpointing_config.run_name:
+        checkpointing_config = replace(
+            checkpointing_config,
+            run_name=datetime.now().strftime("%Y-%m-%d_%H-%M-%S"),
+        )
+
     configs = {
         "data": data_config,
         "model": model_config,
@@ -142,22 +169,15 @@ def initialize_run_dir(checkpointing_config: CheckpointingConfig) -> str:
     """Initialize a directory for the current training run.
 
     Creates a unique directory for storing training, evaluation, and logging artifacts.
-    If no run name is specified in the config, generates a timestamp-based name.
 
     Args:
         checkpointing_config: Configuration object containing run settings.
-            NOTE: Must have a 'run_name' attribute that can be None, in which case
-            a timestamp-based name will be generated.
+            NOTE: The 'run_name' attribute must already be set (see `initialize_configuration`).
 
     Returns:
         str: The path to the run directory.
     """
-    run_name = checkpointing_config.run_name
-    if run_name is None:
-        run_name = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        checkpointing_config.run_name = run_name
-
-    run_dir = os.path.join(checkpointing_config.runs_dir, run_name)
+    run_dir = checkpointing_config.run_path
 
     os.makedirs(run_dir, exist_ok=True)
     return run_dir
@@ -223,16 +243,13 @@ def initialize_dataset(
     data_config: DataConfig,
     fabric: L.Fabric,
     initial_batch_step: Optional[int] = 0,
-    return_fast_forward_steps: bool = False,
 ):
     """Initialize dataset based on the given config.
 
-    This function will return a dataset object, and optionally a fast_forward_steps value.
-
-    The fast_forward_steps value is the number of steps that we need to fast-forward an iterator by,
-    so that we can continue from a ertain batch of data we would have seen had training not previously
-    stopped. Depending on how the dataset is loaded, the amount of steps to fast-forward may be
-    different from the initial_batch_step value.
+    The returned dataset is fast-forwarded, so that iterating over it continues from the batch of
+    data we would have seen at initial_batch_step had training not previously stopped. Depending
+    on how the dataset is loaded, this is done by selecting the right data files and then
+    skipping the remaining examples of the raw (un-collated) dataset.
 
     NOTE: This functionality is primarily useful for streaming datasets (which for large
     datasets is most of the time).
@@ -241,11 +258,9 @@ def initialize_dataset(
         data_config: Configuration object containing dataset settings.
         fabric: A Lightning Fabric instance.
         initial_batch_step: The initial batch step to fast-forward to.
-        return_fast_forward_steps: Whether to return the fast-forward steps value.
 
     Returns:
         Dataset: Initialized dataset object.
-        Optional[int]: Number of steps to fast-forward the iterator by, if return_fast_forward_steps is True.
     """
 
     datasets_config.STREAMING_READ_MAX_RETRIES = 40  # default is 20
@@ -294,6 +309,13 @@ def initialize_dataset(
             download_config=download_config,
         )
 
+    # NOTE: Skipping examples of the raw dataset only advances the underlying stream, so this is
+    # much cheaper than pulling (and collating) the same number of batches from the dataloader.
+    if fast_forward_steps > 0:
+        base_dataset = base_dataset.skip(
+            fast_forward_steps * data_config.dataloader.batch_size
+        )
+
     if data_config.dataset.name == "pico-lm/pretokenized-dolma":
         from .data import ShardedIterableDataset
 
@@ -306,10 +328,7 @@ def initialize_dataset(
     else:
         dataset = base_dataset
 
-    if return_fast_forward_steps:
-        return dataset, fast_forward_steps
-    else:
-        return dataset
+    return dataset
 
 
 def initialize_tokenizer(data_config: DataConfig):
@@ -349,12 +368,25 @@ def initialize_dataloader(
         dataset: A HuggingFace Dataset object containing tokenized text data.
             Expected to have 'input_ids' field in its items.
 
+    NOTE: The batches emitted by the DataLoader contain the 'input_ids' (all but the last token)
+    and the 'labels' (all but the first token) of each sequence as separate tensors.
+
     Returns:
         DataLoader: PyTorch DataLoader instance configured for the dataset.
     """
 
     def _collate_fn(batch):
-        return {"input_ids": [entry["input_ids"] for entry in batch]}
+        # NOTE: We stack the token ids into a single tensor here (on the loader side), so that the
+        # batch is pinned and can be copied to the device asynchronously in the training loop.
+        # The inputs and (shifted) labels are split off as contiguous tensors on the CPU, so
+        # that the device does not have to re-materialize them at every step.
+        token_ids = torch.as_tensor(
+            [entry["input_ids"] for entry in batch], dtype=torch.long
+        )
+        return {
+            "input_ids": token_ids[:, :-1].contiguous(),
+            "labels": token_ids[:, 1:].contiguous(),
+        }
 
     sub_batch_size = data_config.dataloader.batch_size // (
         fabric.world_size * training_config.optimization.gradient_accumulation_steps
@@ -514,8 +546,7 @@ def _initialize_log_file(checkpointing_config: CheckpointingConfig) -> str:
 
     """
 
-    run_dir = os.path.join(checkpointing_config.runs_dir, checkpointing_config.run_name)
-    logs_dir = os.path.join(run_dir, checkpointing_config.logs_dir)
+    logs_dir = checkpointing_config.logs_path
     os.makedirs(logs_dir, exist_ok=True)
 
     # datetime stamp
@@ -576,6 +607,36 @@ def initialize_wandb(
     return wandb_logger
 
 
+# NOTE: The background thread that runs the handlers of the training logger (see
+# initialize_logging); kept at module level, so that re-initializing the logging (e.g. when a new
+# Trainer is created in the same process) replaces the previous listener rather than leaking it.
+_LOG_QUEUE_LISTENER: Optional[QueueListener] = None
+
+
+def _stop_log_queue_listener() -> None:
+    """Stop the log queue listener (if any), after it has written out all queued records."""
+    global _LOG_QUEUE_LISTENER
+    if _LOG_QUEUE_LISTENER is not None:
+        _LOG_QUEUE_LISTENER.stop()
+        for handler in _LOG_QUEUE_LISTENER.handlers:
+            handler.close()
+        _LOG_QUEUE_LISTENER = None
+
+
+atexit.register(_stop_log_queue_listener)
+
+
+def flush_logging() -> None:
+    """Block until all queued log records have been written out by the log handlers.
+
+    NOTE: A QueueListener cannot be flushed as such; stopping it drains the queue, after which
+    it is simply started again.
+    """
+    if _LOG_QUEUE_LISTENER is not None:
+        _LOG_QUEUE_LISTENER.stop()
+        _LOG_QUEUE_LISTENER.start()
+
+
 def initialize_logging(
     monitoring_config: MonitoringConfig,
     checkpointing_config: CheckpointingConfig,
@@ -585,6 +646,12 @@ def initialize_logging(
 
     The default logging system uses a file handler and a stream handler.
 
+    NOTE: The logger itself only puts the log records on a queue; the file and stream handlers
+    are run by a background thread (a QueueListener), so that writing the logs does not block
+    the training loop. The listener is stopped (and the queue drained) at interpreter exit, or
+    when the logging is initialized again; use flush_logging to write out the queued records
+    (e.g. before uploading the log file).
+
     Args:
         monitoring_config: Configuration object containing monitoring settings.
         checkpointing_config: Configuration object containing checkpointing settings.
@@ -600,6 +667,12 @@ def initialize_logging(
     logger = logging.getLogger("pico-train")
     logger.setLevel(logging.INFO)
 
+    # Tear down the handlers of a previous initialization
+    _stop_log_queue_listener()
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+
     # Create file handler
     log_file_path = _initialize_log_file(checkpointing_config)
     file_handler = logging.FileHandler(log_file_path, encoding="utf-8")
@@ -612,14 +685,21 @@ def initialize_logging(
     )
     file_handler.setFormatter(formatter)
 
-    # Add the handler to the logger
-    logger.addHandler(file_handler)
-
     # Add a stream handler for console output
     stream_handler = logging.StreamHandler()
     stream_handler.setLevel(monitoring_config.logging.log_level)
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
+
+    # Run the handlers on a background thread that consumes the logger's queue
+    global _LOG_QUEUE_LISTENER
+    log_queue = queue.Queue(-1)
+    _LOG_QUEUE_LISTENER = QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    _LOG_QUEUE_LISTENER.start()
+
+    # Add the queue handler to the logger
+    logger.addHandler(QueueHandler(log_queue))
 
     return logger
 
@@ -644,12 +724,15 @@ def initialize_hf_checkpointing(
             a 'hf_checkpoint' attribute that specifies the HuggingFace repository id and
             collection slug (if applicable) to save the checkpoint to.
 
+    Returns:
+        CheckpointingConfig: The checkpointing config with the fully qualified repo id.
+
     Raises:
         RuntimeError: If unable to create HuggingFace repository after multiple attempts.
     """
 
     if fabric.global_rank != 0:
-        return
+        return checkpointing_config
 
     huggingface_repo_id = checkpointing_config.hf_checkpoint.repo_id
     assert (
@@ -661,8 +744,13 @@ def initialize_hf_checkpointing(
     # can create a repo without a specified namespace (will default to username)
     # however the rest of the HF calls need the fully qualified name
     # this is returned by create repo, so we update the config for later calls
-    checkpointing_config.hf_checkpoint.repo_id = repo.repo_id
     huggingface_repo_id = repo.repo_id
+    checkpointing_config = replace(
+        checkpointing_config,
+        hf_checkpoint=replace(
+            checkpointing_config.hf_checkpoint, repo_id=huggingface_repo_id
+        ),
+    )
 
     if checkpointing_config.hf_checkpoint.collection_slug:
         add_collection_item(
@@ -677,3 +765,5 @@ def initialize_hf_checkpointing(
         branch=checkpointing_config.run_name,
         exist_ok=True,
     )
+
+    return checkpointing_config
@@ -1,6 +1,14 @@
 import time
+import yaml
 from functools import wraps
 
+# NOTE: Use the libyaml-based (C) loader and dumper when available; they are much faster than the
+# pure-Python implementations, and fall back to those if PyYAML was built without libyaml.
+try:
+    from yaml import CSafeLoader as YamlSafeLoader, CSafeDumper as YamlSafeDumper  # noqa: F401
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader, SafeDumper as YamlSafeDumper  # noqa: F401
+
 
 def use_backoff(max_retries=2, initial_delay=1, backoff_factor=2):
     """
@@ -48,3 +56,19 @@ def use_backoff(max_retries=2, initial_delay=1, backoff_factor=2):
         return wrapper
 
     return _decorator
+
+
+def load_yaml(path: str):
+    """
+    Safely load a yaml file, using the libyaml-based loader if available.
+
+    NOTE: The file is opened in binary mode, so that libyaml can consume the bytes directly.
+
+    Args:
+        path: Path to the yaml file.
+
+    Returns:
+        The parsed contents of the yaml file.
+    """
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=YamlSafeLoader)
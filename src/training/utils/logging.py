@@ -2,15 +2,59 @@
 Miscellaneous logging utilities.
 """
 
-from rich.console import Console
-from rich.panel import Panel
-from io import StringIO
+import hashlib
+import json
+import os
+import tempfile
 import yaml
 
+from .io import YamlSafeDumper, load_yaml
+
+from typing import Iterator
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Yield the lines of text one by one, without materializing a list of all lines."""
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            end = len(text)
+        yield text[start:end]
+        start = end + 1
+
+
+def render_yaml_config(config: dict) -> Iterator[str]:
+    """
+    Render config as yaml inside a box, line by line. Assumes that the config is already
+    saved as a dictionary - this can be done by calling `asdict` on the dataclass or loading in
+    the config from a yaml file.
+
+    NOTE: The box is drawn by hand with the same (rounded) box characters that a rich Panel uses;
+    since the output goes to a log rather than a terminal, we don't need rich's layout engine.
+
+    Args:
+        config: Dictionary containing the config to render.
+
+    Yields:
+        The rendered lines.
+    """
+    # Convert to YAML string first
+    yaml_str = yaml.dump(
+        config, default_flow_style=False, sort_keys=False, Dumper=YamlSafeDumper
+    )
+    width = max(map(len, _iter_lines(yaml_str)), default=0)
+
+    # Draw the box around the yaml lines (with a padding of one space on either side)
+    yield "╭" + "─" * (width + 2) + "╮"
+    for line in _iter_lines(yaml_str):
+        yield f"│ {line.ljust(width)} │"
+    yield "╰" + "─" * (width + 2) + "╯"
+
 
 def pretty_print_yaml_config(logger, config: dict) -> None:
     """
-    Pretty print config with rich formatting. Assumes that the config is already saved as a
+    Pretty print config inside a box. Assumes that the config is already saved as a
     dictionary - this can be done by calling `asdict` on the dataclass or loading in the config
     from a yaml file.
 
@@ -18,26 +62,48 @@ def pretty_print_yaml_config(logger, config: dict) -> None:
         logger: Logger object to log the formatted output to.
         config: Dictionary containing the config to pretty print.
     """
-    # Create string buffer
-    output = StringIO()
-    console = Console(file=output, force_terminal=False)
+    # Log the formatted output
+    for line in render_yaml_config(config):
+        logger.info(line)
 
-    # Convert to YAML string first
-    yaml_str = yaml.dump(
-        config, default_flow_style=False, sort_keys=False, Dumper=yaml.SafeDumper
-    )
 
-    # Create formatted panel
-    panel = Panel(
-        yaml_str,
-        border_style="blue",
-        padding=(0, 1),  # Reduced padding
-        expand=False,  # Don't expand to terminal width
-    )
+def pretty_print_yaml_config_file(logger, config_path: str) -> None:
+    """
+    Pretty print a yaml config file inside a box.
 
-    # Print to buffer
-    console.print(panel)
+    NOTE: The rendered lines are cached (along with the modification time of the config file) in
+    a JSON file in the system temp directory, keyed by the absolute path of the config file; as
+    long as the config file is unchanged, later runs neither re-parse nor re-render it.
 
-    # Log the formatted output
-    for line in output.getvalue().splitlines():
+    Args:
+        logger: Logger object to log the formatted output to.
+        config_path: Path to the yaml config file to pretty print.
+    """
+    config_path = os.path.abspath(config_path)
+    mtime = os.path.getmtime(config_path)
+
+    path_hash = hashlib.sha1(config_path.encode()).hexdigest()
+    cache_path = os.path.join(tempfile.gettempdir(), f"pico_config_{path_hash}.json")
+
+    rendered_lines = None
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+        if cache["mtime"] == mtime:
+            rendered_lines = cache["rendered_lines"]
+    except (OSError, ValueError, KeyError):
+        # NOTE: a missing or corrupted cache is simply re-built below
+        pass
+
+    if rendered_lines is None:
+        rendered_lines = list(render_yaml_config(load_yaml(config_path)))
+
+        # NOTE: Writing to a temporary file first and then renaming it, so that the cache file
+        # is replaced atomically and never left half-written.
+        tmp_cache_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_cache_path, "w") as f:
+            json.dump({"mtime": mtime, "rendered_lines": rendered_lines}, f)
+        os.replace(tmp_cache_path, cache_path)
+
+    for line in rendered_lines:
         logger.info(line)